@@ -22,6 +22,24 @@
     return `${normalizedBase}assets/data/sf6-reports/${encodeURIComponent(cfnLower)}.json`;
   }
 
+  // Prebuilt Plotly specs written next to each report by tools/sf6_figures.py
+  function buildFiguresUrl(cfnLower) {
+    return buildReportUrl(cfnLower).replace(/\/([^/]+)$/, "/figures/$1");
+  }
+
+  async function fetchFigures(cfnLower, watermark) {
+    try {
+      const res = await fetch(buildFiguresUrl(cfnLower), { cache: "no-store" });
+      if (!res.ok) return null;
+      const figs = await res.json();
+      // Specs from an older build than the report would show stale charts
+      return figs && figs.source_watermark === watermark ? figs : null;
+    } catch (err) {
+      console.warn("[sf6-report] No figure specs, drawing charts in the browser", err);
+      return null;
+    }
+  }
+
   function safePurge(div) {
     if (!div) return;
     if (typeof Plotly !== "undefined" && Plotly && typeof Plotly.purge === "function") {
@@ -186,6 +204,9 @@
     const bestFullBody = document.getElementById("sf6-matchup-best-full");
     const worstFullBody = document.getElementById("sf6-matchup-worst-full");
 
+    // Figure specs for the loaded report (null -> build charts from report data)
+    let currentFigures = null;
+
     // Start “resting” state hidden
     setReportVisible(false);
 
@@ -240,6 +261,7 @@
     }
 
     function clearAll() {
+      currentFigures = null;
       clearCharacterBanner();
       clearFixOne();
       clearRankedBullets();
@@ -1034,6 +1056,19 @@
 
     function renderMrTrendForCharacter(character, rankedSummary) {
       if (!mrTrendDiv || !mrTrendText) return;
+
+      const spec = currentFigures && currentFigures.mr ? currentFigures.mr[character] : null;
+      if (spec) {
+        mrTrendText.style.display = "none";
+        Plotly.react(mrTrendDiv, spec.data, spec.layout, { displayModeBar: false, responsive: true })
+          .then(() => renderMrWeeklyForCharacter(character, rankedSummary))
+          .catch((err) => {
+            console.error(`[sf6-report] MR trend for ${character} error`, err);
+            mrTrendText.textContent = `Could not render MR trend for ${character}.`;
+            mrTrendText.style.display = "block";
+          });
+        return;
+      }
       
       const charMrData = rankedSummary && rankedSummary.character_mr_timeseries 
         ? rankedSummary.character_mr_timeseries[character]
@@ -1790,6 +1825,16 @@
     function renderChart(data) {
       if (!chartDiv) return;
 
+      const spec = currentFigures && currentFigures.overview;
+      if (spec && typeof Plotly !== "undefined") {
+        Plotly.react(chartDiv, spec.data, spec.layout, {
+          responsive: true,
+          displaylogo: false,
+          modeBarButtonsToRemove: ["select2d", "lasso2d", "toggleSpikelines"],
+        });
+        return;
+      }
+
       const matchups = data && data.matchups ? data.matchups : [];
       if (!Array.isArray(matchups) || matchups.length === 0) {
         safePurge(chartDiv);
@@ -1891,6 +1936,7 @@
         }
 
         const data = await res.json();
+        currentFigures = await fetchFigures(cfn, data.source_watermark);
         const reportTitle = document.getElementById("sf6-report-status");
         if (reportTitle) {
           reportTitle.textContent = `Report for ${data.player_cfn}`;
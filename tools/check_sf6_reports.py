@@ -0,0 +1,331 @@
+# tools/check_sf6_reports.py
+# Consistency checks for the SF6 report builder (tools/sf6_reports.py).
+#   python tools/check_sf6_reports.py                       # players from the DB
+#   python tools/check_sf6_reports.py --frames some/dir     # saved MATCH_QUERY frames (*.parquet)
+#   python tools/check_sf6_reports.py --frames some/dir --golden some/dir/golden [--update-golden]
+#   python tools/check_sf6_reports.py --fixtures            # committed synthetic frames + goldens
+# With --golden, every frame's report is also diffed against the stored golden
+# report (floats within tolerance) and each stage is held to the time / memory
+# budget recorded in golden/budgets.json. Times are the best of TIME_REPEATS
+# runs, in units of a fixed pandas workload timed in the same process, so
+# budgets carry over between machines and survive a busy one.
+import argparse
+import json
+import math
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import sf6_reports
+from sf6_config import DATABASE_URL, ENGINES, load_config, roster_cfns
+
+FLOAT_REL_TOL = 1e-6
+FLOAT_ABS_TOL = 1e-9
+MAX_DIFFS_SHOWN = 10
+
+# Budgets are recorded as measured * headroom, so normal noise passes
+TIME_HEADROOM = 3.0
+MEMORY_HEADROOM = 1.5
+MIN_TIME_BUDGET_UNITS = 10.0     # tiny stages are all noise below this (~0.2s here)
+MIN_MEMORY_BUDGET_MB = 1.0
+TIME_REPEATS = 5                 # stage times are the best of this many runs
+CALIBRATION_ROWS = 200_000
+
+BUDGETS_FILE = "budgets.json"
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "sf6"  # frames from fixtures/sf6/make_frames.py
+
+# Top-level steps of build_report that get their own budget
+SUMMARY_STEPS = ["build_overall_summary", "build_ranked_summary", "compute_activity_by_week_modes"]
+
+
+def report_text(report: dict) -> str:
+    """Serialized report without generated_at (the only field expected to differ)."""
+    report = {k: v for k, v in report.items() if k != "generated_at"}
+    return json.dumps(report, indent=2)
+
+
+def _first_diff(a: str, b: str) -> str:
+    for i, (la, lb) in enumerate(zip(a.splitlines(), b.splitlines()), start=1):
+        if la != lb:
+            return f"line {i}: {la.strip()!r} != {lb.strip()!r}"
+    return "length differs"
+
+
+# ----------------------------
+# Engine equivalence
+# ----------------------------
+def check_engines(df: pd.DataFrame, player_cfn: str, engines: list[str] = ENGINES) -> bool:
+    """True if every engine emits byte-identical JSON for df."""
+    ref_engine, *others = engines
+    ref = report_text(sf6_reports.build_report(df.copy(), player_cfn, engine=ref_engine))
+
+    ok = True
+    for engine in others:
+        text = report_text(sf6_reports.build_report(df.copy(), player_cfn, engine=engine))
+        if text != ref:
+            print(f"[FAIL] {player_cfn}: {engine} != {ref_engine} ({_first_diff(ref, text)})")
+            ok = False
+    if ok:
+        print(f"[OK]   {player_cfn}: {', '.join(engines)} identical")
+    return ok
+
+
+# ----------------------------
+# Golden reports
+# ----------------------------
+def _is_number(x) -> bool:
+    return isinstance(x, (int, float)) and not isinstance(x, bool)
+
+
+def diff_reports(expected, actual, path: str = "") -> list[str]:
+    """Structural differences between two report trees; floats compare within tolerance."""
+    if _is_number(expected) and _is_number(actual):
+        if math.isclose(expected, actual, rel_tol=FLOAT_REL_TOL, abs_tol=FLOAT_ABS_TOL):
+            return []
+        return [f"{path or '/'}: {expected!r} != {actual!r}"]
+    if type(expected) is not type(actual):
+        return [f"{path or '/'}: {type(expected).__name__} != {type(actual).__name__}"]
+
+    if isinstance(expected, dict):
+        diffs = [f"{path}/{k}: missing" for k in expected if k not in actual]
+        diffs += [f"{path}/{k}: unexpected" for k in actual if k not in expected]
+        for k in expected.keys() & actual.keys():
+            diffs += diff_reports(expected[k], actual[k], f"{path}/{k}")
+        return diffs
+    if isinstance(expected, list):
+        if len(expected) != len(actual):
+            return [f"{path or '/'}: {len(expected)} items != {len(actual)}"]
+        diffs = []
+        for i, (e, a) in enumerate(zip(expected, actual)):
+            diffs += diff_reports(e, a, f"{path}[{i}]")
+        return diffs
+    return [] if expected == actual else [f"{path or '/'}: {expected!r} != {actual!r}"]
+
+
+def _golden_report(report: dict) -> dict:
+    return json.loads(report_text(report))
+
+
+# ----------------------------
+# Stage budgets
+# ----------------------------
+@contextmanager
+def _instrumented(engine: str, record):
+    """
+    Wrap build_report's stage functions and top-level summary builders so each
+    call reports to record(name, fn, args, kwargs).
+    """
+    stages = sf6_reports._stages(engine)
+    saved_stages = dict(stages)
+    saved_steps = {name: getattr(sf6_reports, name) for name in SUMMARY_STEPS}
+
+    def wrap(name, fn):
+        return lambda *args, **kwargs: record(name, fn, args, kwargs)
+
+    try:
+        for name, fn in saved_stages.items():
+            stages[name] = wrap(name, fn)
+        for name, fn in saved_steps.items():
+            setattr(sf6_reports, name, wrap(name, fn))
+        yield
+    finally:
+        stages.update(saved_stages)
+        for name, fn in saved_steps.items():
+            setattr(sf6_reports, name, fn)
+
+
+@contextmanager
+def _replaying(df: pd.DataFrame):
+    """Make build_player_json read df instead of querying the DB."""
+    saved = sf6_reports.load_matches
+    sf6_reports.load_matches = lambda conn, player_cfn: df.copy()
+    try:
+        yield
+    finally:
+        sf6_reports.load_matches = saved
+
+
+@lru_cache(maxsize=1)
+def calibration_seconds() -> float:
+    """Best-of-TIME_REPEATS time of a fixed groupby / sort / rolling workload: one budget "unit"."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"key": rng.integers(0, 500, CALIBRATION_ROWS), "value": rng.random(CALIBRATION_ROWS)})
+    best = math.inf
+    for _ in range(TIME_REPEATS):
+        start = time.perf_counter()
+        df.groupby("key")["value"].agg(["size", "sum", "mean"])
+        df.sort_values("value")
+        df["value"].rolling(10).mean()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_stages(df: pd.DataFrame, player_cfn: str) -> tuple[dict, dict]:
+    """
+    Replay df through build_player_json, returning (report, {stage: {"units", "peak_mb"}}).
+    units is the stage's best time over TIME_REPEATS runs / calibration_seconds().
+    Time and memory come from separate runs (tracemalloc slows everything down).
+    """
+    usage: dict[str, dict] = {}
+    run: dict[str, float] = {}
+    overall_peak = 0  # reset_peak() in each stage hides earlier peaks from the final reading
+
+    def timed(name, fn, args, kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            run[name] = run.get(name, 0.0) + time.perf_counter() - start
+
+    def traced(name, fn, args, kwargs):
+        nonlocal overall_peak
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            peak = tracemalloc.get_traced_memory()[1]
+            overall_peak = max(overall_peak, peak)
+            peak_mb = (peak - base) / 2**20
+            usage[name]["peak_mb"] = max(usage[name]["peak_mb"], peak_mb)
+
+    unit = calibration_seconds()
+    with _replaying(df), _instrumented("pandas", timed):
+        for _ in range(TIME_REPEATS):
+            run.clear()
+            start = time.perf_counter()
+            report = sf6_reports.build_player_json(None, player_cfn)
+            run["total"] = time.perf_counter() - start
+            for name, seconds in run.items():
+                u = usage.setdefault(name, {"units": math.inf, "peak_mb": 0.0})
+                u["units"] = min(u["units"], seconds / unit)
+
+    tracemalloc.start()
+    try:
+        with _replaying(df), _instrumented("pandas", traced):
+            sf6_reports.build_player_json(None, player_cfn)
+            overall_peak = max(overall_peak, tracemalloc.get_traced_memory()[1])
+        usage["total"]["peak_mb"] = overall_peak / 2**20
+    finally:
+        tracemalloc.stop()
+    return report, usage
+
+
+def _budget(usage: dict) -> dict:
+    return {
+        stage: {
+            "units": round(max(u["units"] * TIME_HEADROOM, MIN_TIME_BUDGET_UNITS), 1),
+            "peak_mb": round(max(u["peak_mb"] * MEMORY_HEADROOM, MIN_MEMORY_BUDGET_MB), 1),
+        }
+        for stage, u in usage.items()
+    }
+
+
+def over_budget(usage: dict, budget: dict) -> list[str]:
+    problems = []
+    for stage, limit in budget.items():
+        used = usage.get(stage)
+        if used is None:
+            problems.append(f"{stage}: not run")
+            continue
+        if used["units"] > limit["units"]:
+            problems.append(f"{stage}: {used['units']:.1f} > {limit['units']} units")
+        if used["peak_mb"] > limit["peak_mb"]:
+            problems.append(f"{stage}: {used['peak_mb']:.1f} MB > {limit['peak_mb']} MB")
+    return problems
+
+
+def check_golden(df: pd.DataFrame, player_cfn: str, golden_dir: Path, budgets: dict, update: bool = False) -> bool:
+    """Diff against golden_dir/<cfn>.json and enforce budgets[cfn]; with update, record both instead."""
+    report, usage = measure_stages(df, player_cfn)
+    golden_path = golden_dir / f"{player_cfn.lower()}.json"
+
+    if update:
+        golden_dir.mkdir(parents=True, exist_ok=True)
+        golden = {k: v for k, v in report.items() if k != "generated_at"}
+        golden_path.write_text(json.dumps(golden, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        budgets[player_cfn.lower()] = _budget(usage)
+        print(f"[REC]  {player_cfn}: golden report + budgets ({usage['total']['units']:.1f} units)")
+        return True
+
+    if not golden_path.exists():
+        print(f"[FAIL] {player_cfn}: no golden report at {golden_path} (run with --update-golden)")
+        return False
+
+    ok = True
+    diffs = diff_reports(json.loads(golden_path.read_text(encoding="utf-8")), _golden_report(report))
+    if diffs:
+        ok = False
+        print(f"[FAIL] {player_cfn}: {len(diffs)} difference(s) from golden report")
+        for d in diffs[:MAX_DIFFS_SHOWN]:
+            print(f"         {d}")
+
+    budget = budgets.get(player_cfn.lower())
+    if budget is None:
+        print(f"[WARN] {player_cfn}: no recorded budget")
+    else:
+        problems = over_budget(usage, budget)
+        if problems:
+            ok = False
+            print(f"[FAIL] {player_cfn}: over budget")
+            for p in problems:
+                print(f"         {p}")
+
+    if ok:
+        print(f"[OK]   {player_cfn}: matches golden report, within budget ({usage['total']['units']:.1f} units)")
+    return ok
+
+
+def iter_frames(args):
+    """Yield (player_cfn, raw frame) from --frames files or the DB."""
+    if args.frames:
+        for path in sorted(Path(args.frames).glob("*.parquet")):
+            yield path.stem, pd.read_parquet(path)
+        return
+
+    from sqlalchemy import create_engine
+
+    engine = create_engine(DATABASE_URL)
+    with engine.connect() as conn:
+        for cfn in args.players or roster_cfns(load_config()):
+            yield cfn, sf6_reports.load_matches(conn, cfn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check SF6 report engines produce identical JSON.")
+    parser.add_argument("--players", nargs="*", help="CFNs to load from the DB (default: roster)")
+    parser.add_argument("--frames", help="directory of saved MATCH_QUERY frames (*.parquet)")
+    parser.add_argument("--golden", type=Path, help="directory of golden reports + budgets.json")
+    parser.add_argument("--update-golden", action="store_true", help="re-record golden reports and budgets")
+    parser.add_argument("--fixtures", action="store_true", help=f"same as --frames {FIXTURES_DIR} --golden …/golden")
+    args = parser.parse_args()
+    if args.fixtures:
+        args.frames = args.frames or FIXTURES_DIR
+        args.golden = args.golden or FIXTURES_DIR / "golden"
+
+    budgets = {}
+    budgets_path = args.golden / BUDGETS_FILE if args.golden else None
+    if budgets_path and budgets_path.exists():
+        budgets = json.loads(budgets_path.read_text(encoding="utf-8"))
+
+    ok = True
+    for cfn, df in iter_frames(args):
+        if df.empty:
+            continue
+        ok &= check_engines(df, cfn)
+        if args.golden:
+            ok &= check_golden(df, cfn, args.golden, budgets, update=args.update_golden)
+
+    if args.update_golden and budgets_path:
+        budgets_path.write_text(json.dumps(budgets, indent=2, sort_keys=True), encoding="utf-8")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# tools/fixtures/sf6/make_frames.py
+# Writes the synthetic MATCH_QUERY frames replayed by check_sf6_reports.py --fixtures.
+# No real players: characters, MR and results are drawn from a seeded RNG.
+#   python tools/fixtures/sf6/make_frames.py
+# Re-record the golden reports afterwards (check_sf6_reports.py --fixtures --update-golden).
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+OUT_DIR = Path(__file__).parent
+
+CHARS = ["Ryu", "Ken", "Luke", "Cammy", "A.K.I.", "Dee Jay", "Mai", "Juri", "Sagat", "Akuma", "Ed"]
+MODES = ["Rank", "custom", "casual", "hub"]
+START = pd.Timestamp("2025-10-01 12:00", tz="UTC")  # spans both 2025/26 DST switches
+
+# cfn -> (matches, seed); "gamma d. x" also checks awkward CFNs and null strings
+PLAYERS = {"alpha": (1500, 0), "gamma d. x": (1200, 2)}
+
+
+def make_frame(player_cfn: str, n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    gaps = np.where(rng.random(n) < 0.08, rng.integers(40, 3000, n), rng.integers(1, 6, n))
+    mr = 1500 + np.cumsum(rng.integers(-15, 16, n)).astype(float)
+    mr[:50] = 25000  # LP-era rows (not MR-valid)
+    opp_mr = mr + rng.integers(-200, 200, n)
+    df = pd.DataFrame(
+        {
+            "match_hash": [f"{player_cfn}-{i}" for i in range(n)],
+            "player_cfn": player_cfn,
+            "player_character": rng.choice(CHARS[:4] + [None], n, p=[0.5, 0.2, 0.15, 0.1, 0.05]),
+            "player_mr": mr,
+            "opponent_character": rng.choice(CHARS, n).astype(object),
+            "opponent_mr": opp_mr,
+            "match_timestamp": START + pd.to_timedelta(np.cumsum(gaps), unit="min"),
+            "is_winner": rng.random(n) < 0.5 + (opp_mr < mr) * 0.05,
+            "match_mode": rng.choice(MODES, n, p=[0.6, 0.2, 0.15, 0.05]).astype(object),
+        }
+    )
+    if " " in player_cfn:
+        df.loc[df.index[::97], "opponent_character"] = None
+        df.loc[df.index[5::131], "match_mode"] = None
+    return df
+
+
+def main():
+    for cfn, (n, seed) in PLAYERS.items():
+        out = OUT_DIR / f"{cfn}.parquet"
+        make_frame(cfn, n, seed).to_parquet(out, index=False)
+        print(f"Wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
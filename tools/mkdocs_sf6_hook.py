@@ -0,0 +1,84 @@
+# tools/mkdocs_sf6_hook.py
+# MkDocs hook (registered under `hooks:` in mkdocs.yml).
+# Before the first build, rebuilds only the SF6 reports whose
+# source_watermark is behind the DB, plus their PNG charts.  `mkdocs serve`
+# keeps re-checking in the background; a rewritten JSON is picked up by the
+# normal file watcher (use `mkdocs serve --dirty` so only changed files are
+# rebuilt).
+# Without the DB or its drivers (e.g. on Netlify) the committed JSON is used
+# as-is.  Set SF6_REFRESH=0 to skip the check entirely.
+import logging
+import os
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import sf6_config  # noqa: E402  (needs the sys.path entry above)
+
+log = logging.getLogger("mkdocs.hooks.sf6")
+
+REFRESH_INTERVAL_SECONDS = 300  # how often `mkdocs serve` re-checks the DB
+
+_checked = False
+_stop = threading.Event()
+
+
+def _enabled() -> bool:
+    return os.environ.get("SF6_REFRESH", "1") != "0"
+
+
+def refresh_stale() -> list[str]:
+    """Rebuild stale reports and their charts; return the players rebuilt."""
+    cfns = sf6_config.roster_cfns(sf6_config.load_config())
+    try:
+        stale = sf6_config.stale_players(cfns)
+    except Exception as exc:  # no driver / DB unreachable -> ship committed JSON
+        log.info("SF6 reports: freshness check skipped (%s: %s)", type(exc).__name__, exc)
+        return []
+    if not stale:
+        log.debug("SF6 reports: all %d up to date", len(cfns))
+        return []
+
+    log.info("SF6 reports: rebuilding %s", ", ".join(stale))
+    import sf6_reports
+
+    failed = sf6_reports.main_sync(stale, roster=cfns)  # roster.json only if every player was stale
+    for cfn in failed:
+        log.warning("SF6 reports: %s failed to build, keeping the old report", cfn)
+    built = [cfn for cfn in stale if cfn not in failed]
+    if not built:
+        return built  # build_visuals([]) would redraw every report's charts
+
+    try:
+        import build_sf6_visuals
+
+        build_sf6_visuals.build_visuals(built)
+    except Exception as exc:  # plotly / kaleido are optional for site builds
+        log.info("SF6 reports: charts not rebuilt (%s: %s)", type(exc).__name__, exc)
+    return built
+
+
+def on_pre_build(config, **kwargs):
+    global _checked
+    if _checked or not _enabled():
+        return
+    _checked = True  # serve rebuilds are handled by the poller below
+    refresh_stale()
+
+
+def on_serve(server, config, builder, **kwargs):
+    if not _enabled():
+        return server
+
+    def poll():
+        while not _stop.wait(REFRESH_INTERVAL_SECONDS):
+            refresh_stale()
+
+    threading.Thread(target=poll, name="sf6-refresh", daemon=True).start()
+    return server
+
+
+def on_shutdown(**kwargs):
+    _stop.set()
@@ -0,0 +1,170 @@
+# tools/serve_sf6_reports.py
+# Local HTTP service that builds SF6 reports on demand for any CFN.
+#   python tools/serve_sf6_reports.py --port 8765
+#   curl http://localhost:8765/report/braventooth
+import argparse
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+import sf6_reports
+from sf6_config import DATABASE_URL, ENGINES
+
+# Cheap revalidation probe: has this player played since we built the report?
+LATEST_MATCH_QUERY = """
+SELECT max(match_timestamp)
+FROM sf.v_match_player_norm
+WHERE lower(player_cfn) = lower(:player_cfn);
+"""
+
+CACHE_SIZE = 32            # players kept in memory
+CACHE_TTL_SECONDS = 300    # serve without probing the DB for this long
+
+
+@dataclass
+class CacheEntry:
+    watermark: pd.Timestamp | None   # latest match_timestamp the report covers
+    report: dict
+    checked_at: float                # time.monotonic() of the last build / probe
+
+
+class ReportCache:
+    """
+    LRU of player_cfn -> report, valid for the player's latest match_timestamp.
+
+    - Within ttl seconds of the last check an entry is served as-is.
+    - After that, the max(match_timestamp) probe decides between reusing the
+      entry and rebuilding it.
+    - Concurrent requests for the same player share one probe/build.
+    """
+
+    def __init__(self, db, engine: str = "pandas", maxsize: int = CACHE_SIZE, ttl: float = CACHE_TTL_SECONDS):
+        self.db = db
+        self.engine = engine
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def get(self, player_cfn: str) -> dict:
+        key = player_cfn.strip().lower()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry.checked_at < self.ttl:
+                self._entries.move_to_end(key)
+                return entry.report
+
+            fut = self._inflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = self._inflight[key] = Future()
+
+        if not owner:
+            return fut.result()
+
+        try:
+            entry = self._refresh(key, entry)
+        except Exception as exc:
+            fut.set_exception(exc)
+            raise
+        else:
+            fut.set_result(entry.report)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return entry.report
+
+    def _refresh(self, key: str, entry: CacheEntry | None) -> CacheEntry:
+        if entry is not None and self._latest_match(key) == entry.watermark:
+            entry.checked_at = time.monotonic()
+        else:
+            with self.db.connect() as conn:
+                df, archive = sf6_reports.load_player_matches(conn, key)  # reads the archive, never writes it
+            watermark = pd.to_datetime(df["match_timestamp"]).max() if not df.empty else None
+            report = sf6_reports.build_report(df, key, engine=self.engine, archive=archive)
+            entry = CacheEntry(watermark=watermark, report=report, checked_at=time.monotonic())
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def _latest_match(self, key: str) -> pd.Timestamp | None:
+        with self.db.connect() as conn:
+            latest = conn.execute(text(LATEST_MATCH_QUERY), {"player_cfn": key}).scalar()
+        return pd.to_datetime(latest) if latest is not None else None
+
+
+# ----------------------------
+# HTTP
+# ----------------------------
+class ReportHandler(BaseHTTPRequestHandler):
+    cache: ReportCache  # set by make_server
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/healthz":
+            return self._send_json(200, {"ok": True})
+        if not path.startswith("/report/"):
+            return self._send_json(404, {"error": "expected /report/<cfn>"})
+
+        player_cfn = unquote(path[len("/report/"):])
+        if not player_cfn:
+            return self._send_json(404, {"error": "missing cfn"})
+
+        try:
+            report = self.cache.get(player_cfn)
+        except Exception as exc:
+            return self._send_json(500, {"error": f"{type(exc).__name__}: {exc}"})
+        if not report:
+            return self._send_json(404, {"error": f"no matches for {player_cfn}"})
+        return self._send_json(200, report)
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Access-Control-Allow-Origin", "*")  # mkdocs serve runs on another port
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def make_server(host: str, port: int, cache: ReportCache) -> ThreadingHTTPServer:
+    handler = type("BoundReportHandler", (ReportHandler,), {"cache": cache})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve SF6 report JSON for any CFN.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--engine", choices=ENGINES, default="pandas")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    parser.add_argument("--ttl", type=float, default=CACHE_TTL_SECONDS, help="seconds before revalidating")
+    args = parser.parse_args()
+
+    cache = ReportCache(create_engine(DATABASE_URL), engine=args.engine, maxsize=args.cache_size, ttl=args.ttl)
+    server = make_server(args.host, args.port, cache)
+    print(f"Serving SF6 reports on http://{args.host}:{args.port}/report/<cfn>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
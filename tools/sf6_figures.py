@@ -0,0 +1,287 @@
+# tools/sf6_figures.py
+# Plotly figure specs (plain JSON dicts) built from a finished report.
+# Written next to each report by sf6_reports.write_report; the Matchup Lab
+# page hands them straight to Plotly.react and build_sf6_visuals.py turns
+# the same specs into PNGs, so the charts are defined once, here.
+# Traces are sorted and decimated up front and use WebGL (scattergl).
+import numpy as np
+import pandas as pd
+
+FIG_MAX_CURVE_POINTS = 200   # per-opponent cum-winrate points kept
+FIG_MAX_MR_POINTS = 2000     # MR line points kept (min/max per bucket)
+MR_RESET_ISO = "2026-02-01T00:00:00.000Z"  # same marker as sf6-report.js
+
+BG = "#050816"
+GRID = "#1F2933"
+WEEK_MS = 7 * 24 * 60 * 60 * 1000
+
+
+# ----------------------------
+# Decimation
+# ----------------------------
+def _even_idx(n: int, max_points: int) -> np.ndarray:
+    """Evenly spaced indices (first and last always kept)."""
+    if n <= max_points:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, max_points).round().astype(np.int64))
+
+
+def _minmax_idx(y: np.ndarray, max_points: int) -> np.ndarray:
+    """Indices of the min and max of each of max_points/2 buckets, in order."""
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+    bucket = np.arange(n) * (max_points // 2) // n
+    order = np.lexsort((y, bucket))  # by bucket, then value
+    starts = np.flatnonzero(np.r_[True, np.diff(bucket[order]) != 0])
+    ends = np.r_[starts[1:] - 1, n - 1]
+    return np.unique(np.r_[order[starts], order[ends], 0, n - 1])
+
+
+# ----------------------------
+# Figures
+# ----------------------------
+def overview_spec(report: dict) -> dict | None:
+    """Cumulative winrate per opponent (curves already sorted by games)."""
+    matchups = report.get("matchups") or []
+    if not matchups:
+        return None
+
+    traces = []
+    for m in matchups:
+        idx = _even_idx(len(m["games"]), FIG_MAX_CURVE_POINTS)
+        traces.append(
+            {
+                "type": "scattergl",
+                "name": m["opponent"],
+                "x": np.asarray(m["games"])[idx].tolist(),
+                "y": np.round(np.asarray(m["cum_winrate"])[idx] * 100, 2).tolist(),
+                "mode": "lines+markers",
+                "line": {"width": 2},
+                "marker": {"size": 4},
+                "hovertemplate": f"{m['opponent']}<br>Game %{{x}}<br>Winrate %{{y:.1f}}%<extra></extra>",
+            }
+        )
+
+    return {
+        "data": traces,
+        "layout": {
+            "paper_bgcolor": BG,
+            "plot_bgcolor": BG,
+            "font": {"color": "#E5E7EB"},
+            "margin": {"t": 60, "r": 160, "b": 60, "l": 60},
+            "title": {
+                "text": (
+                    f"Matchup performance for {report['player_cfn']}<br>"
+                    f"<span style='font-size:0.8em;'>"
+                    f"Baseline {report.get('baseline_n')} games · cumulative winrate</span>"
+                ),
+                "x": 0,
+                "xanchor": "left",
+            },
+            "xaxis": {"title": {"text": "Games played vs character"}, "zeroline": False, "gridcolor": GRID, "dtick": 5},
+            "yaxis": {
+                "title": {"text": "Cumulative win rate (%)"},
+                "range": [0, 100],
+                "tickformat": ".0f",
+                "ticksuffix": "%",
+                "gridcolor": GRID,
+            },
+            "legend": {
+                "x": 1.02,
+                "xanchor": "left",
+                "y": 0.5,
+                "bgcolor": "#111827",
+                "bordercolor": "#4B5563",
+                "borderwidth": 1,
+                "font": {"size": 10},
+            },
+            "shapes": [
+                {
+                    "type": "line",
+                    "xref": "paper",
+                    "x0": 0,
+                    "x1": 1,
+                    "y0": 50,
+                    "y1": 50,
+                    "line": {"color": "#6B7280", "width": 1, "dash": "dash"},
+                }
+            ],
+        },
+    }
+
+
+def worst_spec(report: dict) -> dict | None:
+    """Current winrate per opponent, worst first."""
+    matchups = [m for m in report.get("matchups") or [] if m["games"]]
+    if not matchups:
+        return None
+
+    names = np.array([m["opponent"] for m in matchups])
+    games = np.array([m["games"][-1] for m in matchups])
+    wr = np.array([m["cum_winrate"][-1] for m in matchups]) * 100
+    order = np.argsort(wr, kind="stable")
+    wr = wr[order]
+
+    return {
+        "data": [
+            {
+                "type": "bar",
+                "orientation": "h",
+                "x": np.round(wr, 2).tolist(),
+                "y": names[order].tolist(),
+                "text": [f"{v:.1f}%" for v in wr],
+                "textposition": "auto",
+                "marker": {"color": np.where(wr < 50, "#F87171", "#22C55E").tolist()},
+                "customdata": games[order].tolist(),
+                "hovertemplate": "%{y}: %{x:.1f}% winrate (%{customdata} games)<extra></extra>",
+            }
+        ],
+        "layout": {
+            "paper_bgcolor": BG,
+            "plot_bgcolor": BG,
+            "font": {"color": "#E5E7EB"},
+            "title": {
+                "text": (
+                    f"Current winrate by matchup for {report['player_cfn']}<br>"
+                    "<span style='font-size:0.8em;'>Worst → best</span>"
+                ),
+                "x": 0,
+                "xanchor": "left",
+            },
+            "xaxis": {"title": {"text": "Win rate (%)"}, "range": [0, 100], "gridcolor": GRID, "ticksuffix": "%"},
+            "yaxis": {"automargin": True, "gridcolor": GRID},
+            "margin": {"t": 60, "r": 40, "b": 60, "l": 120},
+        },
+    }
+
+
+def _week_markers(ts: pd.Series, mr: np.ndarray) -> tuple[pd.DatetimeIndex, np.ndarray, list[str]]:
+    """
+    MR carried forward to every Sunday 00:00 UTC in range; labelled only for
+    weeks with games (same rules as the page's week-end markers).
+    """
+    day = ts.dt.floor("D")
+    week_end = day + pd.to_timedelta((6 - ts.dt.weekday) % 7, unit="D")  # next Sunday (or today)
+    sundays = pd.date_range(week_end.iloc[0], week_end.iloc[-1], freq="7D")
+
+    last = np.searchsorted(ts.to_numpy(), sundays.to_numpy(), side="right") - 1
+    has = last >= 0
+    played = np.isin(sundays.to_numpy(), week_end.to_numpy())
+    values = mr[last[has]]
+    labels = np.where(played[has], np.char.mod("%.0f", values), "").tolist()
+    return sundays[has], values, labels
+
+
+def _mr_reset_markers(x0: pd.Timestamp, x1: pd.Timestamp) -> dict:
+    reset = pd.Timestamp(MR_RESET_ISO)
+    if not x0 <= reset <= x1:
+        return {"shapes": [], "annotations": []}
+    return {
+        "shapes": [
+            {
+                "type": "line", "xref": "x", "yref": "paper",
+                "x0": MR_RESET_ISO, "x1": MR_RESET_ISO, "y0": 0, "y1": 1,
+                "line": {"color": "rgba(248,113,113,0.7)", "width": 1, "dash": "dot"},
+            }
+        ],
+        "annotations": [
+            {
+                "xref": "x", "yref": "paper", "x": MR_RESET_ISO, "y": 0.98,
+                "yanchor": "top", "xanchor": "left", "xshift": 6,
+                "text": "MR reset", "showarrow": False,
+                "font": {"size": 9, "color": "#f87171"},
+                "bgcolor": "rgba(5,8,22,0.6)", "bordercolor": "rgba(248,113,113,0.4)",
+                "borderwidth": 1, "borderpad": 2,
+            }
+        ],
+    }
+
+
+def mr_spec(points: list[dict], name: str) -> dict | None:
+    """MR over time plus week-end markers for one mr_timeseries list."""
+    pts = [p for p in points if p.get("mr") is not None and p.get("ts")]
+    if not pts:
+        return None
+
+    ts = pd.Series(pd.to_datetime([p["ts"] for p in pts], utc=True, format="ISO8601"))  # whole seconds drop ".%f"
+    mr = np.array([p["mr"] for p in pts], dtype=float)
+    order = np.argsort(ts.to_numpy(), kind="stable")
+    ts = ts.iloc[order].reset_index(drop=True)
+    mr = mr[order]
+
+    idx = _minmax_idx(mr, FIG_MAX_MR_POINTS)
+    iso = ts.dt.strftime("%Y-%m-%dT%H:%M:%SZ").to_numpy()
+    sundays, week_mr, labels = _week_markers(ts, mr)
+    x_range = [sundays[0], sundays[-1] + pd.Timedelta(days=7)] if len(sundays) else None
+    reset = _mr_reset_markers(*x_range) if x_range else {"shapes": [], "annotations": []}
+
+    return {
+        "data": [
+            {
+                "type": "scattergl",
+                "name": f"{name} MR",
+                "x": iso[idx].tolist(),
+                "y": mr[idx].tolist(),
+                "mode": "lines",
+                "line": {"color": "#2c8c89", "width": 2},
+                "hovertemplate": "<b>%{y:.0f}</b><br>%{x}<extra></extra>",
+            },
+            {
+                "type": "scattergl",
+                "name": "Week End",
+                "x": sundays.strftime("%Y-%m-%dT%H:%M:%SZ").tolist(),
+                "y": week_mr.tolist(),
+                "mode": "markers+text",
+                "marker": {"color": "#f87171", "size": 8, "symbol": "circle"},
+                "text": labels,
+                "textposition": "top right",
+                "textfont": {"color": "#f87171", "size": 10},
+                "hovertemplate": "<b>Week End: %{y:.0f} MR</b><br>%{x}<extra></extra>",
+            },
+        ],
+        "layout": {
+            "margin": {"l": 30, "r": 10, "t": 5, "b": 30},
+            "paper_bgcolor": "rgba(0,0,0,0)",
+            "plot_bgcolor": "rgba(0,0,0,0)",
+            "font": {"color": "#e5e7eb", "size": 8},
+            "xaxis": {
+                "type": "date",
+                "tickmode": "linear",
+                "showgrid": True,
+                "gridcolor": "rgba(255,255,255,0.05)",
+                "tickangle": -45,
+                "tickfont": {"size": 7},
+                "tick0": int(sundays[0].value // 10**6) if len(sundays) else 0,
+                "dtick": WEEK_MS,
+                "tickformat": "%b %d",
+                "range": [t.strftime("%Y-%m-%dT%H:%M:%SZ") for t in x_range] if x_range else None,
+                "showspikes": False,
+            },
+            "yaxis": {
+                "showgrid": True,
+                "gridcolor": "rgba(255,255,255,0.08)",
+                "zeroline": False,
+                "tickfont": {"size": 7},
+                "showspikes": False,
+            },
+            "height": 280,
+            "legend": {"orientation": "h", "y": -0.12, "x": 0.5, "xanchor": "center", "font": {"size": 7}},
+            **reset,
+        },
+    }
+
+
+def build_figure_specs(report: dict) -> dict:
+    """{"overview", "worst", "mr": {character: spec}} for one report (None = no data)."""
+    ranked = report.get("summary", {}).get("ranked") or {}
+    return {
+        "player_cfn": report.get("player_cfn"),
+        "source_watermark": report.get("source_watermark"),
+        "overview": overview_spec(report),
+        "worst": worst_spec(report),
+        "mr": {
+            char: mr_spec(points, char)
+            for char, points in (ranked.get("character_mr_timeseries") or {}).items()
+        },
+    }
@@ -0,0 +1,204 @@
+# tools/sf6_polars_engine.py
+# Polars implementation of the report stages in sf6_reports.STAGES.
+# Each stage runs as a LazyFrame query and hands back the same pandas
+# frame / list as the pandas stage, so the summary builders are shared and
+# both engines emit identical JSON.  Selected with `--engine polars`.
+import numpy as np
+import pandas as pd
+import polars as pl
+
+import sf6_reports as base
+from sf6_reports import (
+    BASELINE_N,
+    CUBE_DIMS,
+    EXPECTED_SCORE_SCALE,
+    MR_MAX,
+    REPORT_TZ,
+    SESSION_COLUMNS,
+    SESSION_GAP_MINUTES,
+)
+
+
+def _lazy(df: pd.DataFrame, cols: list[str]) -> pl.LazyFrame:
+    return pl.from_pandas(df[cols]).lazy()
+
+
+def _num(col: str) -> pl.Expr:
+    return pl.col(col).cast(pl.Float64, strict=False)
+
+
+def _norm_str(col: str, null_as: str | None = None) -> pl.Expr:
+    # nulls stay null, like base._norm_lower
+    expr = pl.col(col).cast(pl.String)
+    if null_as is not None:
+        expr = expr.fill_null(null_as)
+    return expr.str.strip_chars()
+
+
+def _expected() -> pl.Expr:
+    # same formula as base.expected_score; null where either MR is missing
+    diff = pl.col("player_mr") - pl.col("opponent_mr")
+    return 1.0 / (1.0 + pl.lit(10.0).pow(-diff / EXPECTED_SCORE_SCALE))
+
+
+# ----------------------------
+# Stages
+# ----------------------------
+def normalize_matches(df: pd.DataFrame) -> pd.DataFrame:
+    """Polars version of base.normalize_matches."""
+    df = df.copy()
+    # Mixed-offset strings are easier to parse with pandas, exactly like the pandas engine
+    if not pd.api.types.is_datetime64_any_dtype(df["match_timestamp"]):
+        df["match_timestamp"] = pd.to_datetime(df["match_timestamp"], errors="coerce")
+
+    cols = ["opponent_character", "is_winner", "match_mode", "player_mr", "opponent_mr"]
+    norm = _lazy(df, cols).select(
+        _norm_str("opponent_character").str.to_lowercase().alias("opp_char_norm"),
+        (_norm_str("is_winner").str.to_lowercase() == "true").fill_null(False).cast(pl.Int64).alias("win_int"),
+        _norm_str("match_mode").str.to_lowercase().alias("match_mode"),
+        ((_num("player_mr") <= MR_MAX) & (_num("opponent_mr") <= MR_MAX)).fill_null(False).alias("mr_valid"),
+    ).collect()
+
+    for col in norm.columns:
+        df[col] = norm[col].to_pandas().set_axis(df.index)
+    return df
+
+
+def build_stats_cube(df: pd.DataFrame, tz_name: str = REPORT_TZ) -> pd.DataFrame:
+    """Polars version of base.build_stats_cube."""
+    if df.empty:
+        return base.build_stats_cube(df, tz_name)
+
+    # Local buckets come from the shared UTC-epoch / offset-table helpers
+    local_day, hour = base._local_parts(base.utc_epoch_ns(df["match_timestamp"]), tz_name)
+    # player_character is optional: missing counts as "" like in base.build_stats_cube
+    player_char = df["player_character"] if "player_character" in df else pd.Series(None, index=df.index, dtype=object)
+    keys = df[["match_mode", "mr_valid", "opp_char_norm", "win_int", "player_mr", "opponent_mr"]]
+    keys = keys.assign(
+        player_character=player_char,
+        local_day=local_day.to_numpy(),
+        hour_bucket=hour.to_numpy() // 2 * 2,
+    )
+
+    cube = (
+        pl.from_pandas(keys)
+        .lazy()
+        .with_columns(
+            _norm_str("player_character", null_as="").alias("player_char"),
+            _num("player_mr").alias("player_mr"),
+            _num("opponent_mr").alias("opponent_mr"),
+        )
+        .with_columns(_expected().alias("expected"))
+        .group_by(CUBE_DIMS)
+        .agg(
+            pl.len().cast(pl.Int64).alias("games"),
+            pl.col("win_int").sum().cast(pl.Int64).alias("wins"),
+            pl.col("player_mr").sum().alias("player_mr_sum"),
+            pl.col("player_mr").count().cast(pl.Int64).alias("player_mr_n"),
+            pl.col("opponent_mr").sum().alias("opponent_mr_sum"),
+            pl.col("opponent_mr").count().cast(pl.Int64).alias("opponent_mr_n"),
+            pl.col("expected").sum().alias("expected_sum"),
+        )
+        .collect()
+    )
+    return cube.to_pandas()
+
+
+def summarize_sessions(df: pd.DataFrame) -> pd.DataFrame:
+    """Polars version of base.summarize_sessions."""
+    if df.empty:
+        return base.summarize_sessions(df)
+
+    win = pl.col("win_int")
+    game_no = pl.col("game_no")
+    in_35 = game_no.is_between(3, 5)
+
+    games = (
+        _lazy(df, ["match_timestamp", "win_int", "player_mr", "opponent_mr"])
+        .with_columns(_num("player_mr").alias("player_mr"), _num("opponent_mr").alias("opponent_mr"))
+        .with_columns(_expected().fill_null(0.0).fill_nan(0.0).alias("expected"))
+        .sort("match_timestamp", maintain_order=True, nulls_last=True)
+        .with_columns(
+            (pl.col("match_timestamp").diff() >= pl.duration(minutes=SESSION_GAP_MINUTES))
+            .fill_null(False)
+            .cum_sum()
+            .alias("sid")
+        )
+        .with_columns(
+            pl.int_range(1, pl.len() + 1).over("sid").alias("game_no"),
+            pl.struct("sid", "win_int").rle_id().alias("run"),
+        )
+    )
+
+    streaks = (
+        games.group_by("sid", "run")
+        .agg(win.first(), pl.len().alias("run_len"))
+        .group_by("sid")
+        .agg(
+            pl.col("run_len").filter(win == 1).max().fill_null(0).alias("max_win_streak"),
+            pl.col("run_len").filter(win == 0).max().fill_null(0).alias("max_loss_streak"),
+        )
+    )
+
+    sessions = (
+        games.group_by("sid", maintain_order=True)
+        .agg(
+            pl.len().alias("size"),
+            win.sum().alias("wins"),
+            pl.col("player_mr").first().alias("mr_first"),
+            pl.col("player_mr").last().alias("mr_last"),
+            pl.col("match_timestamp").first().alias("start_ts"),
+            win.first().alias("g1_win"),
+            win.filter(game_no == 2).first().alias("g2_win"),
+            win.filter(in_35).sum().alias("g35_wins"),
+            in_35.sum().alias("g35_n"),
+            win.tail(3).sum().alias("last3_wins"),
+            pl.len().clip(upper_bound=3).alias("last3_n"),
+            pl.col("expected").sum().alias("expected_wins"),
+        )
+        .join(streaks, on="sid", how="left")
+        .sort("sid")
+        .select(SESSION_COLUMNS)
+        .collect()
+    )
+    return sessions.to_pandas()
+
+
+def compute_matchup_curves(df_rank_mr: pd.DataFrame) -> list[dict]:
+    """Polars version of base.compute_matchup_curves (same input ordering)."""
+    if df_rank_mr.empty:
+        return []
+
+    opp = "opp_char_norm"
+    curves = (
+        _lazy(df_rank_mr, [opp, "win_int"])
+        .drop_nulls(opp)  # pandas groupby drops null keys
+        .with_columns(
+            pl.int_range(1, pl.len() + 1).over(opp).alias("games_so_far"),
+            pl.col("win_int").cum_sum().over(opp).alias("wins_so_far"),
+        )
+        .filter(pl.col("games_so_far") >= BASELINE_N)
+        .with_columns((pl.col("wins_so_far") / pl.col("games_so_far")).alias("cum_winrate"))
+        .sort(opp, maintain_order=True)
+        .collect()
+    )
+
+    matchups_out = []
+    for (opp_name,), sub in curves.partition_by(opp, maintain_order=True, as_dict=True).items():
+        matchups_out.append(
+            {
+                "opponent": opp_name.title(),
+                "games": sub["games_so_far"].to_list(),
+                # numpy rounding, to match pandas Series.round exactly
+                "cum_winrate": np.round(sub["cum_winrate"].to_numpy(), 4).tolist(),
+            }
+        )
+    return matchups_out
+
+
+STAGES = {
+    "normalize": normalize_matches,
+    "cube": build_stats_cube,
+    "sessions": summarize_sessions,
+    "curves": compute_matchup_curves,
+}
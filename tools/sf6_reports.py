@@ -0,0 +1,1836 @@
+# tools/sf6_reports.py
+# Report building for the SF6 Matchup Lab (CLI: tools/generate_sf6_reports.py).
+import asyncio
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+try:
+    import orjson  # optional: serializes large reports several times faster
+except ImportError:
+    orjson = None
+
+from sf6_config import (
+    ASYNC_DATABASE_URL,
+    DATABASE_URL,
+    ENGINES,
+    OUTPUT_DIR,
+    REPORT_TZ,
+    ROSTER_FILE,
+    archive_dir,
+    figures_path,
+    player_activity_timezones,
+    player_recent_days,
+    player_timezone,
+    report_path,
+    roster_path,
+)
+from sf6_figures import build_figure_specs
+
+MATCH_QUERY = """
+SELECT
+    match_hash,
+    lower(player_cfn) AS player_cfn,
+    player_character,
+    player_lp      AS player_mr,      -- MR stored in LP field in this view
+    opponent_character,
+    opponent_lp    AS opponent_mr,    -- MR stored in LP field in this view
+    match_timestamp,
+    is_winner,
+    lower(match_mode) AS match_mode
+FROM sf.v_match_player_norm
+WHERE lower(player_cfn) = lower(:player_cfn)
+ORDER BY match_timestamp;
+"""
+
+# Columns of a player's frame kept for the roster benchmark
+ROSTER_COLUMNS = ["player_cfn", "player_mr", "opponent_character", "opponent_mr", "match_timestamp", "is_winner", "match_mode"]
+
+BASELINE_N = 5              # baseline 5 games before first point
+MIN_GAMES_FOR_STABLE = 10   # for best/worst matchup stats
+MIN_GAMES_FOR_CHARACTER = 50  # played characters below this get no sub-report
+CI_Z = 1.96                 # 95% intervals
+BOOTSTRAP_SAMPLES = 1000
+BOOTSTRAP_SEED = 0          # fixed so rebuilt reports are identical
+EXPECTED_SCORE_SCALE = 400  # Elo-style: +400 MR over the opponent -> 10:1 expected odds
+SESSION_GAP_MINUTES = 30
+
+FIX_MAX_K = 5                              # largest matchup set in the what-if table
+FIX_TARGET_WINRATES = [0.50, 0.55, 0.60]   # winrates the fixed matchups are moved to
+
+MR_MAX = 2500
+OPP_MR_BRACKETS = [1300, 1500, 1700, 1900, 2100]   # opponent-MR bracket edges (lower edge inclusive)
+MR_DIFF_BRACKETS = [-200, -100, 0, 100, 200]       # player MR - opponent MR bracket edges
+ROSTER_MR_DIFF_STEP = 100   # MR-difference bin width for the MR-adjusted roster baseline
+ROSTER_MR_DIFF_CLIP = 400   # larger gaps share the outermost bin
+MAX_WEEKS = 12
+ARCHIVE_VERSION = 2         # bump when summarize_month changes: every archived month is rebuilt
+ARCHIVE_HASH_CHARS = 16
+
+FETCH_CONCURRENCY = 4       # player queries in flight (= async pool size)
+BUILD_WORKERS = 4           # processes running build_report
+
+
+# ----------------------------
+# Time helpers
+# ----------------------------
+NS_PER_HOUR = 3_600 * 10**9
+NS_PER_DAY = 24 * NS_PER_HOUR
+_NAT = np.iinfo(np.int64).min
+_OFFSET_STEP = "15min"  # every tz database transition falls on a quarter hour
+
+
+def utc_epoch_ns(series: pd.Series) -> np.ndarray:
+    """int64 ns since the epoch (UTC) for a timestamp column; naive = UTC, NaT -> _NAT."""
+    s = pd.to_datetime(series, errors="coerce")
+    if s.dt.tz is not None:
+        s = s.dt.tz_convert("UTC").dt.tz_localize(None)
+    return s.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+@lru_cache(maxsize=64)
+def offset_table(tz_name: str, first_year: int, last_year: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (transition instants, UTC offsets), both int64 ns, for tz_name over
+    first_year..last_year. Built once per zone and span, then shared by
+    every player and every timezone variant.
+    """
+    grid = pd.date_range(
+        f"{first_year}-01-01", f"{last_year + 1}-01-01", freq=_OFFSET_STEP, tz="UTC", unit="ns"
+    )
+    utc = grid.tz_localize(None).asi8
+    offsets = grid.tz_convert(tz_name).tz_localize(None).asi8 - utc
+    change = np.r_[True, offsets[1:] != offsets[:-1]]
+    starts = utc[change]
+    starts[0] = _NAT  # first offset also covers anything earlier
+    return starts, offsets[change]
+
+
+def local_epoch_ns(epoch_ns: np.ndarray, tz_name: str) -> np.ndarray:
+    """Wall-clock ns in tz_name for UTC epoch ns (one searchsorted, _NAT stays _NAT)."""
+    nat = epoch_ns == _NAT
+    if nat.all():
+        return epoch_ns.copy()
+    years = epoch_ns[~nat].view("datetime64[ns]").astype("datetime64[Y]").astype(np.int64) + 1970
+    starts, offsets = offset_table(tz_name, int(years.min()), int(years.max()))
+    local = epoch_ns + offsets[np.searchsorted(starts, epoch_ns, side="right") - 1]
+    return np.where(nat, _NAT, local)
+
+
+def _local_parts(epoch_ns: np.ndarray, tz_name: str) -> tuple[pd.Series, pd.Series]:
+    """(local midnight as naive datetime64, hour 0-23) per row; NaT rows -> NaT / NaN."""
+    local = local_epoch_ns(epoch_ns, tz_name)
+    nat = local == _NAT
+    day = np.where(nat, _NAT, local // NS_PER_DAY * NS_PER_DAY).view("datetime64[ns]")
+    hour = pd.Series((local % NS_PER_DAY) // NS_PER_HOUR)
+    return pd.Series(day), hour.where(~nat) if nat.any() else hour
+
+
+def local_midnight_utc_ns(day: pd.Timestamp, tz_name: str) -> int:
+    """UTC epoch ns of a naive local midnight in tz_name (DST gaps -> next valid instant)."""
+    return pd.Timestamp(day).tz_localize(tz_name, ambiguous=False, nonexistent="shift_forward").value
+
+
+def _local_week_start(ts: pd.Series, tz_name: str = REPORT_TZ) -> list:
+    """Monday (local) of each timestamp's week, as "YYYY-MM-DD"."""
+    day, _ = _local_parts(utc_epoch_ns(ts), tz_name)
+    return _date_col(day - pd.to_timedelta(day.dt.weekday, unit="D"))
+
+
+def _week_start_sunday_local(ts_local_midnight: pd.Timestamp) -> pd.Timestamp:
+    """
+    Given a local-tz midnight timestamp, return the Sunday-start midnight (local tz).
+    pandas weekday: Mon=0..Sun=6
+    We want Sunday as start.
+    """
+    days_since_sun = (ts_local_midnight.weekday() + 1) % 7
+    return (ts_local_midnight - pd.Timedelta(days=days_since_sun)).normalize()
+
+
+# ----------------------------
+# Serialization helpers
+# Columns are rounded / formatted in bulk, then zipped into row dicts.
+# ----------------------------
+def _col(values, ndigits: int | None = None) -> list:
+    """Float column -> JSON-ready list (NumPy rounding, NaN -> None)."""
+    arr = np.asarray(values, dtype=float)
+    if ndigits is not None:
+        arr = np.round(arr, ndigits)
+    missing = np.isnan(arr)
+    if not missing.any():
+        return arr.tolist()
+    out = arr.astype(object)
+    out[missing] = None
+    return out.tolist()
+
+
+def _int_col(values) -> list:
+    return np.asarray(values, dtype=np.int64).tolist()
+
+
+def _date_col(ts: pd.Series) -> list:
+    """Local calendar date ("YYYY-MM-DD") of each timestamp (NaT -> None)."""
+    wall = ts.dt.tz_localize(None) if ts.dt.tz is not None else ts
+    arr = wall.to_numpy(dtype="datetime64[D]")
+    out = np.datetime_as_string(arr, unit="D").astype(object)
+    out[np.isnat(arr)] = None
+    return out.tolist()
+
+
+def _iso_col(ts: pd.Series) -> list:
+    """Timestamp.isoformat() for a whole column (NaT -> None)."""
+    tz = ts.dt.tz
+    if tz is not None and str(tz) != "UTC":
+        return [t.isoformat() if pd.notna(t) else None for t in ts]
+
+    arr = (ts.dt.tz_localize(None) if tz is not None else ts).to_numpy(dtype="datetime64[us]")
+    nat = np.isnat(arr)
+    whole = arr.astype(np.int64) % 1_000_000 == 0
+    out = np.where(whole, np.datetime_as_string(arr, unit="s"), np.datetime_as_string(arr, unit="us"))
+    if tz is not None:
+        out = np.char.add(out, "+00:00")
+    out = out.astype(object)
+    out[nat] = None
+    return out.tolist()
+
+
+def _records(**cols: list) -> list[dict]:
+    """Equal-length column lists -> list of row dicts."""
+    keys = list(cols)
+    return [dict(zip(keys, row)) for row in zip(*cols.values())]
+
+
+def dumps_report(report: dict) -> bytes:
+    """Serialize a report (indent=2), with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(report, indent=2, ensure_ascii=False).encode("utf-8")  # orjson writes raw UTF-8 too
+
+
+# ----------------------------
+# Stats cube
+# ----------------------------
+CUBE_DIMS = ["match_mode", "mr_valid", "player_char", "opp_char_norm", "local_day", "hour_bucket"]
+CUBE_MEASURES = [
+    "games", "wins", "player_mr_sum", "player_mr_n", "opponent_mr_sum", "opponent_mr_n", "expected_sum",
+]
+
+
+def expected_score(player_mr, opponent_mr) -> np.ndarray:
+    """Elo-style expected score of each match from the MR difference (NaN if either MR is missing)."""
+    diff = np.asarray(player_mr, dtype=float) - np.asarray(opponent_mr, dtype=float)
+    return 1.0 / (1.0 + np.power(10.0, -diff / EXPECTED_SCORE_SCALE))
+
+
+def build_stats_cube(df: pd.DataFrame, tz_name: str = REPORT_TZ) -> pd.DataFrame:
+    """
+    Sparse aggregate of all matches in one groupby:
+      (mode, mr_valid, player char, opponent char, local day, 2-hour bucket)
+      -> games, wins, MR sums/counts, summed expected score
+    player_char is the stripped character name ("" = unknown); local_day is
+    the naive wall-clock midnight in tz_name.
+    Summaries roll this up with rollup() instead of regrouping match rows.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=CUBE_DIMS + CUBE_MEASURES)
+
+    local_day, hour = _local_parts(utc_epoch_ns(df["match_timestamp"]), tz_name)
+    player_char = df["player_character"] if "player_character" in df else pd.Series(None, index=df.index)
+    player_mr = pd.to_numeric(df["player_mr"], errors="coerce")
+    opponent_mr = pd.to_numeric(df["opponent_mr"], errors="coerce")
+    keys = pd.DataFrame(
+        {
+            "match_mode": df["match_mode"],
+            "mr_valid": df["mr_valid"] if "mr_valid" in df else True,
+            "player_char": player_char.where(player_char.notna(), "").astype(str).str.strip(),
+            "opp_char_norm": df["opp_char_norm"],
+            "local_day": local_day.to_numpy(),
+            "hour_bucket": (hour.to_numpy() // 2) * 2,
+            "win_int": df["win_int"].astype(int),
+            "player_mr": player_mr,
+            "opponent_mr": opponent_mr,
+            "expected": expected_score(player_mr, opponent_mr),
+        },
+        index=df.index,
+    )
+
+    return (
+        keys.groupby(CUBE_DIMS, dropna=False)
+        .agg(
+            games=("win_int", "size"),
+            wins=("win_int", "sum"),
+            player_mr_sum=("player_mr", "sum"),
+            player_mr_n=("player_mr", "count"),
+            opponent_mr_sum=("opponent_mr", "sum"),
+            opponent_mr_n=("opponent_mr", "count"),
+            expected_sum=("expected", "sum"),
+        )
+        .reset_index()
+    )
+
+
+def ranked_cells(cube: pd.DataFrame) -> pd.DataFrame:
+    """Cube cells for ranked, MR-valid matches (the build_ranked_summary subset)."""
+    return cube[cube["match_mode"].eq("rank") & cube["mr_valid"].astype(bool)]
+
+
+def rollup(cube: pd.DataFrame, dims: list[str]) -> pd.DataFrame:
+    """Sum cube measures over every dimension not in dims (sorted by dims)."""
+    return cube.groupby(dims)[CUBE_MEASURES].sum().reset_index()
+
+
+def _character_breakdown(cube: pd.DataFrame) -> list[dict]:
+    """Games per played character (title-cased) plus an "Unknown" bucket."""
+    total = int(cube["games"].sum())
+    if not total:
+        return []
+
+    chars = cube.assign(character=cube["player_char"].str.title())
+    known = chars[chars["player_char"] != ""]
+    counts = known.groupby("character")["games"].sum().sort_values(ascending=False, kind="stable")
+
+    out = [
+        {
+            "character": character,
+            "games": int(games),
+            "share_pct": round(100 * int(games) / total, 1),
+        }
+        for character, games in counts.items()
+    ]
+
+    # Add "Unknown" for games without character data
+    unknown_count = total - int(counts.sum())
+    if unknown_count > 0:
+        out.append(
+            {
+                "character": "Unknown",
+                "games": int(unknown_count),
+                "share_pct": round(100 * unknown_count / total, 1),
+            }
+        )
+    return out
+
+
+# ----------------------------
+# Activity: daily (for legacy / debug)
+# ----------------------------
+def compute_activity_by_day(df: pd.DataFrame, cube: pd.DataFrame | None = None) -> list[dict]:
+    """
+    Daily activity time series.
+    Output:
+      [{ "date": "YYYY-MM-DD", "matches": int, "wins": int, "winrate": float|null }]
+    """
+    if df.empty:
+        return []
+
+    if cube is None:
+        cube = build_stats_cube(df)
+    g = rollup(cube, ["local_day"])
+
+    return _records(
+        date=_date_col(g["local_day"]),
+        matches=_int_col(g["games"]),
+        wins=_int_col(g["wins"]),
+        winrate=_col(g["wins"] / g["games"].where(g["games"] > 0), 4),
+    )
+
+
+# ----------------------------
+# Activity: weekly heatmap grid (Sun..Sat) in the report timezone
+# ----------------------------
+def compute_activity_by_week(
+    df: pd.DataFrame,
+    tz_name: str = REPORT_TZ,
+    max_weeks: int = MAX_WEEKS,
+    cube: pd.DataFrame | None = None,
+) -> list[dict]:
+    """
+    Weekly heatmap grid, Sunday..Saturday, bucketed in tz_name.
+
+    Output:
+    [
+      {
+        "week_start": "YYYY-MM-DD",   # Sunday
+        "week_end": "YYYY-MM-DD",     # Saturday
+        "matches": int,
+        "wins": int,
+        "winrate": float | None,
+        "days": [
+          {"date": "YYYY-MM-DD", "matches": int, "wins": int, "winrate": float | None},  # Sun
+          ...
+          {"date": "YYYY-MM-DD", "matches": int, "wins": int, "winrate": float | None},  # Sat
+        ]
+      },
+      ...
+    ]
+    """
+    if df.empty:
+        return []
+
+    # cube local days are already floored to midnight in tz_name
+    if cube is None:
+        cube = build_stats_cube(df, tz_name=tz_name)
+    return _week_grid(rollup(cube, ["local_day"]), max_weeks)
+
+
+def _week_grid(day_cells: pd.DataFrame, max_weeks: int = MAX_WEEKS) -> list[dict]:
+    """Sunday..Saturday week objects from a (local_day, games, wins) rollup."""
+    day = day_cells.rename(columns={"games": "matches"})
+    if day.empty:
+        return []
+
+    # Map date -> counts
+    by_date = dict(zip(_date_col(day["local_day"]), zip(_int_col(day["matches"]), _int_col(day["wins"]))))
+
+    def iso_of(dt: pd.Timestamp) -> str:
+        return dt.date().isoformat()
+
+    # Determine active weeks based on days with matches
+    weeks: dict[str, pd.Timestamp] = {}
+    for dt in day["local_day"]:
+        ws = _week_start_sunday_local(dt)
+        weeks[iso_of(ws)] = ws
+
+    week_list = []
+    for wk_iso, ws in sorted(weeks.items(), key=lambda kv: kv[0]):
+        total_m = 0
+        total_w = 0
+        days_out = []
+
+        for i in range(7):
+            cur = (ws + pd.Timedelta(days=i)).normalize()
+            iso = iso_of(cur)
+            m, w = by_date.get(iso, (0, 0))
+            total_m += m
+            total_w += w
+            wr = (w / m) if m else None
+            days_out.append(
+                {
+                    "date": iso,
+                    "matches": int(m),
+                    "wins": int(w),
+                    "winrate": round(float(wr), 4) if wr is not None else None,
+                }
+            )
+
+        if total_m > 0:
+            week_list.append(
+                {
+                    "week_start": wk_iso,
+                    "week_end": iso_of(ws + pd.Timedelta(days=6)),
+                    "matches": int(total_m),
+                    "wins": int(total_w),
+                    "winrate": round(float(total_w / total_m), 4) if total_m else None,
+                    "days": days_out,
+                }
+            )
+
+    return week_list[-max_weeks:]
+
+
+def compute_activity_by_week_modes(df_all: pd.DataFrame, cube: pd.DataFrame | None = None) -> dict:
+    """
+    Weekly heatmap grids for:
+      - all modes combined (for your “total games played” viz)
+      - each mode separately (optional, for later UI toggles)
+
+    Output:
+      {
+        "all": [... week objects ...],
+        "modes": { "rank": [...], "battlehub": [...], ... }
+      }
+    """
+    out = {"all": [], "modes": {}}
+    if df_all.empty:
+        return out
+
+    if cube is None:
+        cube = build_stats_cube(df_all)
+
+    out["all"] = _week_grid(rollup(cube, ["local_day"]), max_weeks=MAX_WEEKS)
+
+    if "match_mode" in df_all:
+        by_mode = rollup(cube, ["match_mode", "local_day"])
+        for mode, sub in by_mode.groupby("match_mode"):
+            grid = _week_grid(sub, max_weeks=MAX_WEEKS)
+            # keep only if it has data
+            if grid:
+                out["modes"][str(mode)] = grid
+
+    return out
+
+
+def compute_activity_by_week_tz(df_all: pd.DataFrame, tz_names: list[str], max_weeks: int = MAX_WEEKS) -> dict:
+    """
+    {tz_name: all-modes weekly grid} for extra timezones. The UTC epoch array
+    is built once; each zone adds one offset lookup and a bincount.
+    """
+    if df_all.empty:
+        return {}
+
+    epoch = utc_epoch_ns(df_all["match_timestamp"])
+    win = df_all["win_int"].to_numpy(dtype=float)
+    out = {}
+    for tz in tz_names:
+        local = local_epoch_ns(epoch, tz)
+        ok = local != _NAT
+        days, codes = np.unique(local[ok] // NS_PER_DAY, return_inverse=True)
+        day_cells = pd.DataFrame(
+            {
+                "local_day": (days * NS_PER_DAY).view("datetime64[ns]"),
+                "games": np.bincount(codes, minlength=len(days)),
+                "wins": np.bincount(codes, weights=win[ok], minlength=len(days)).astype(np.int64),
+            }
+        )
+        out[tz] = _week_grid(day_cells, max_weeks)
+    return out
+
+
+# ----------------------------
+# Confidence intervals
+# ----------------------------
+def wilson_interval(wins, games, z: float = CI_Z) -> tuple[np.ndarray, np.ndarray]:
+    """Wilson score interval for wins/games, elementwise (NaN where games == 0)."""
+    wins = np.asarray(wins, dtype=float)
+    games = np.asarray(games, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = wins / games
+        denom = 1 + z**2 / games
+        center = (p + z**2 / (2 * games)) / denom
+        half = z * np.sqrt(p * (1 - p) / games + z**2 / (4 * games**2)) / denom
+    return center - half, center + half
+
+
+def bootstrap_interval(wins, games, n_boot: int = BOOTSTRAP_SAMPLES, seed: int = BOOTSTRAP_SEED):
+    """
+    Percentile bootstrap of wins/games for many groups at once.
+    Resampling a group's win/loss rows with replacement is a binomial draw, so
+    all groups are one (n_boot x groups) matrix.
+    """
+    wins = np.asarray(wins, dtype=float)
+    games = np.asarray(games, dtype=np.int64)
+    if not len(games):
+        return np.array([]), np.array([])
+    rng = np.random.default_rng(seed)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = np.where(games > 0, wins / np.maximum(games, 1), 0.0)
+        rates = rng.binomial(games, p, size=(n_boot, len(games))) / games
+    lo, hi = np.percentile(rates, [2.5, 97.5], axis=0)
+    return lo, hi
+
+
+def bootstrap_mean_interval(values: np.ndarray, groups: np.ndarray, n_boot: int = BOOTSTRAP_SAMPLES,
+                            seed: int = BOOTSTRAP_SEED) -> dict:
+    """{group: (lo, hi)} percentile bootstrap of the mean, one resampling matrix per group."""
+    rng = np.random.default_rng(seed)
+    out = {}
+    for key, idx in pd.Series(np.arange(len(values))).groupby(groups, sort=True):
+        v = values[idx.to_numpy()]
+        v = v[~np.isnan(v)]
+        if not len(v):
+            continue
+        means = v[rng.integers(0, len(v), size=(n_boot, len(v)))].mean(axis=1)
+        out[key] = tuple(np.percentile(means, [2.5, 97.5]))
+    return out
+
+
+# ----------------------------
+# Sessions + ranked insights (MR-filtered df)
+# ----------------------------
+SESSION_COLUMNS = [
+    "size", "wins", "mr_first", "mr_last", "start_ts",
+    "g1_win", "g2_win", "g35_wins", "g35_n", "last3_wins", "last3_n",
+    "max_win_streak", "max_loss_streak", "expected_wins",
+]
+
+
+SESSION_BUCKETS = ["1-5", "6-10", "11-15", "16+"]  # session-length buckets (games)
+
+
+def session_bucket(size: pd.Series) -> pd.Series:
+    """SESSION_BUCKETS label for each session size."""
+    return pd.Series(
+        np.select([size <= 5, size <= 10, size <= 15], SESSION_BUCKETS[:3], default=SESSION_BUCKETS[3]),
+        index=size.index,
+    )
+
+
+def summarize_sessions(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per session (gap >= SESSION_GAP_MINUTES starts a new one), in time order:
+      size, wins, first/last player MR, start_ts, warm-up/cool-down win counts
+      the longest win/loss streaks and the summed expected score.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=SESSION_COLUMNS)
+
+    d = df.sort_values("match_timestamp", kind="stable")
+    ts = d["match_timestamp"]
+    win = d["win_int"].astype(int).to_numpy()
+    gap_min = ts.diff().dt.total_seconds().to_numpy() / 60
+    sid = np.cumsum(gap_min >= SESSION_GAP_MINUTES)  # NaN gap on row 0 -> session 0
+
+    game_no = pd.Series(sid).groupby(sid).cumcount().to_numpy() + 1
+    size = np.bincount(sid)
+    from_end = size[sid] - game_no  # 0 for the last game of a session
+
+    # Streaks: a run ends where the session or the result changes
+    new_run = np.r_[True, (np.diff(sid) != 0) | (np.diff(win) != 0)]
+    run_id = np.cumsum(new_run) - 1
+    run_len = np.bincount(run_id)
+    run_sid = sid[new_run]
+    run_win = win[new_run]
+    max_win_streak = np.zeros(len(size), dtype=int)
+    max_loss_streak = np.zeros(len(size), dtype=int)
+    np.maximum.at(max_win_streak, run_sid[run_win == 1], run_len[run_win == 1])
+    np.maximum.at(max_loss_streak, run_sid[run_win == 0], run_len[run_win == 0])
+
+    in_35 = (game_no >= 3) & (game_no <= 5)
+    in_last3 = from_end < 3
+    mr = pd.to_numeric(d["player_mr"], errors="coerce").to_numpy(dtype=float)
+    expected = np.nan_to_num(expected_score(mr, pd.to_numeric(d["opponent_mr"], errors="coerce")))
+    first_idx = np.flatnonzero(game_no == 1)
+    last_idx = np.flatnonzero(from_end == 0)
+
+    return pd.DataFrame(
+        {
+            "size": size,
+            "wins": np.bincount(sid, weights=win).astype(int),
+            "mr_first": mr[first_idx],
+            "mr_last": mr[last_idx],
+            "start_ts": ts.iloc[first_idx].reset_index(drop=True),
+            "g1_win": win[first_idx],
+            "g2_win": pd.Series(win[game_no == 2], index=sid[game_no == 2]).reindex(range(len(size))).to_numpy(),
+            "g35_wins": np.bincount(sid[in_35], weights=win[in_35], minlength=len(size)).astype(int),
+            "g35_n": np.bincount(sid[in_35], minlength=len(size)),
+            "last3_wins": np.bincount(sid[in_last3], weights=win[in_last3], minlength=len(size)).astype(int),
+            "last3_n": np.bincount(sid[in_last3], minlength=len(size)),
+            "max_win_streak": max_win_streak,
+            "max_loss_streak": max_loss_streak,
+            "expected_wins": np.bincount(sid, weights=expected, minlength=len(size)),
+        }
+    )
+
+
+def compute_session_insights(
+    df: pd.DataFrame,
+    cube: pd.DataFrame | None = None,
+    sessions: pd.DataFrame | None = None,
+    tz_name: str = REPORT_TZ,
+):
+    """
+    df should be ranked+MR-valid so mr_delta makes sense.
+    cube / sessions, if given, must be the stats cube (in tz_name) / summarize_sessions of the same rows.
+    """
+    if sessions is None:
+        sessions = summarize_sessions(df)
+
+    # 1) Performance by session length (raw sessions)
+    size = sessions["size"].astype(int)
+    winrate = np.round(sessions["wins"] / size, 4)
+    mr_delta = np.round((sessions["mr_last"] - sessions["mr_first"]).where(size > 1, 0.0), 1)
+    bucket = session_bucket(size)
+    start_ts = pd.to_datetime(sessions["start_ts"])
+
+    by_length = _records(
+        size=_int_col(size),
+        bucket=bucket.tolist(),
+        winrate=_col(winrate),
+        mr_delta=_col(mr_delta),
+        start_ts=_iso_col(start_ts),
+    )
+
+    # aggregate by bucket
+    per_bucket = (
+        pd.DataFrame({"bucket": bucket, "winrate": winrate, "mr_delta": mr_delta})
+        .groupby("bucket")
+        .agg(avg_winrate=("winrate", "mean"), avg_mr_delta=("mr_delta", "mean"), count=("winrate", "size"))
+        .reindex(SESSION_BUCKETS)
+        .dropna(subset=["count"])
+    )
+    bucket_ci = bootstrap_mean_interval(winrate.to_numpy(dtype=float), bucket.to_numpy())
+    by_length_buckets = _records(
+        range=per_bucket.index.tolist(),
+        avg_winrate=_col(per_bucket["avg_winrate"], 4),
+        avg_winrate_ci_low=_col([bucket_ci.get(b, (np.nan, np.nan))[0] for b in per_bucket.index], 4),
+        avg_winrate_ci_high=_col([bucket_ci.get(b, (np.nan, np.nan))[1] for b in per_bucket.index], 4),
+        avg_mr_delta=_col(per_bucket["avg_mr_delta"], 1),
+        count=_int_col(per_bucket["count"]),
+    )
+
+    # weekly_by_length (Monday week start in tz_name)
+    week_start = pd.Series(_local_week_start(start_ts, tz_name), index=sessions.index, dtype=object)
+    weekly = (
+        pd.DataFrame(
+            {
+                "week_start": week_start,
+                "bucket": bucket,
+                "games": size.astype(float),
+                "wins": winrate.fillna(0.0) * size,
+                "mr_delta": mr_delta.fillna(0.0),
+            }
+        )
+        .dropna(subset=["week_start"])
+        .groupby(["week_start", "bucket"])
+        .agg(count=("games", "size"), sum_games=("games", "sum"), sum_wins=("wins", "sum"), sum_mr_delta=("mr_delta", "sum"))
+        .reset_index()
+    )
+    weekly_by_length = _records(
+        week_start=weekly["week_start"].tolist(),
+        bucket=weekly["bucket"].tolist(),
+        count=_int_col(weekly["count"]),
+        avg_winrate=_col(weekly["sum_wins"] / weekly["sum_games"], 4),
+        avg_mr_delta=_col(weekly["sum_mr_delta"] / weekly["count"], 2),
+    )
+
+    # 2) Warm-up / Cool-down
+    warm_counts = {
+        "1": (sessions["g1_win"].sum(), len(sessions)),
+        "2": (sessions["g2_win"].sum(), int(sessions["g2_win"].notna().sum())),
+        "3-5": (sessions["g35_wins"].sum(), sessions["g35_n"].sum()),
+    }
+    warmup_stats = {k: round(int(w) / int(n), 4) for k, (w, n) in warm_counts.items() if n}
+    last3_n = int(sessions["last3_n"].sum())
+    cooldown_stats = {"last3": round(int(sessions["last3_wins"].sum()) / last3_n, 4)} if last3_n else {}
+
+    # 3) Time-of-day heatmap (local)
+    if cube is None:
+        cube = build_stats_cube(df, tz_name=tz_name)
+    cells = rollup(cube, ["local_day", "hour_bucket"])
+    cells["day_of_week"] = cells["local_day"].dt.day_name()
+    heatmap = rollup(cells, ["day_of_week", "hour_bucket"])
+    heatmap["winrate"] = heatmap["wins"] / heatmap["games"]
+    wilson_lo, wilson_hi = wilson_interval(heatmap["wins"], heatmap["games"])
+    boot_lo, boot_hi = bootstrap_interval(heatmap["wins"], heatmap["games"])
+
+    time_of_day_rows = _records(
+        day=heatmap["day_of_week"].tolist(),
+        hour_bucket=_int_col(heatmap["hour_bucket"]),
+        winrate=_col(heatmap["winrate"], 4),
+        games=_int_col(heatmap["games"]),
+        wilson_low=_col(wilson_lo, 4),
+        wilson_high=_col(wilson_hi, 4),
+        bootstrap_low=_col(boot_lo, 4),
+        bootstrap_high=_col(boot_hi, 4),
+    )
+
+    # 4) Momentum / streaks
+    momentum_sessions = _records(
+        size=_int_col(size),
+        max_win_streak=_int_col(sessions["max_win_streak"]),
+        max_loss_streak=_int_col(sessions["max_loss_streak"]),
+        mr_delta=_col(mr_delta),
+    )
+
+    return {
+        "sessions_raw": by_length,
+        "by_length": by_length_buckets,
+        "weekly_by_length": weekly_by_length,
+        "warmup": warmup_stats,
+        "cooldown": cooldown_stats,
+        "time_of_day": time_of_day_rows,
+        "momentum": momentum_sessions,
+    }
+
+
+# ----------------------------
+# Summaries
+# ----------------------------
+def build_overall_summary(df: pd.DataFrame, cube: pd.DataFrame | None = None) -> dict:
+    """All modes, no MR assumptions."""
+    total = int(len(df))
+    start_ts = df["match_timestamp"].min()
+    end_ts = df["match_timestamp"].max()
+
+    if cube is None:
+        cube = build_stats_cube(df)
+
+    mode_breakdown = []
+    if "match_mode" in df and total:
+        counts = rollup(cube, ["match_mode"]).set_index("match_mode")["games"]
+        counts = counts.sort_values(ascending=False, kind="stable")
+        for mode, n in counts.items():
+            mode_breakdown.append(
+                {
+                    "mode": str(mode),
+                    "matches": int(n),
+                    "share_pct": round(100 * int(n) / total, 1),
+                }
+            )
+
+    char_breakdown = []
+    if "player_character" in df and total:
+        char_breakdown = _character_breakdown(cube)
+
+    return {
+        "matches_analyzed": total,
+        "dataset_start": start_ts.date().isoformat() if pd.notna(start_ts) else None,
+        "dataset_end": end_ts.date().isoformat() if pd.notna(end_ts) else None,
+        "mode_breakdown": mode_breakdown,
+        "character_breakdown": char_breakdown,
+    }
+
+
+def compute_fix_matchups(grp: pd.DataFrame) -> list[dict]:
+    """
+    What-if table: for each target in FIX_TARGET_WINRATES and k = 1..FIX_MAX_K,
+    the k matchups whose move to that target lifts overall winrate the most.
+    Moving one matchup changes overall wins by (target * games - wins), independent
+    of the others, so the best k-set is simply the k largest positive gains.
+    grp: per-opponent rollup with opp_char_norm, games, wins.
+    """
+    games = grp["games"].to_numpy(dtype=float)
+    wins = grp["wins"].to_numpy(dtype=float)
+    total_games = games.sum()
+    if not total_games:
+        return []
+    base_wr = wins.sum() / total_games
+
+    targets = np.asarray(FIX_TARGET_WINRATES)[:, None]
+    gains = (targets * games - wins) / total_games                 # targets x matchups
+    order = np.argsort(-gains, axis=1, kind="stable")[:, :FIX_MAX_K]
+    top = np.take_along_axis(gains, order, axis=1)
+    useful = top > 1e-9
+    lift = np.cumsum(np.where(useful, top, 0.0), axis=1)
+    set_games = np.cumsum(games[order], axis=1)
+    names = grp["opp_char_norm"].str.title().to_numpy()
+
+    t_idx, k_idx = np.nonzero(useful)  # useful is a prefix of each row (gains are sorted)
+    return _records(
+        target_winrate_pct=_col(targets[t_idx, 0] * 100, 1),
+        k=_int_col(k_idx + 1),
+        opponents=[names[order[t, : k + 1]].tolist() for t, k in zip(t_idx, k_idx)],
+        games=_int_col(set_games[t_idx, k_idx]),
+        overall_winrate_pct=_col(np.full(len(t_idx), base_wr * 100), 1),
+        new_overall_winrate_pct=_col((base_wr + lift[t_idx, k_idx]) * 100, 1),
+        lift_pct_points=_col(lift[t_idx, k_idx] * 100, 1),
+    )
+
+
+def _bracket_labels(edges: list[int]) -> list[str]:
+    inner = [f"{lo} to {hi}" for lo, hi in zip(edges, edges[1:])]  # "-200 to -100" reads better than "-200--100"
+    return [f"<{edges[0]}", *inner, f">={edges[-1]}"]
+
+
+def compute_mr_bracket_matrix(df_rank_mr: pd.DataFrame) -> dict:
+    """
+    Games/wins per matchup x opponent-MR bracket and per matchup x MR-difference
+    bracket. Each matrix is one np.digitize plus one np.bincount over the
+    combined (opponent, bracket) index.
+    """
+    d = df_rank_mr[df_rank_mr["opp_char_norm"].notna()]
+    opp_codes, opps = pd.factorize(d["opp_char_norm"], sort=True)
+    player_mr = pd.to_numeric(d["player_mr"], errors="coerce").to_numpy(dtype=float)
+    opp_mr = pd.to_numeric(d["opponent_mr"], errors="coerce").to_numpy(dtype=float)
+    win = d["win_int"].to_numpy(dtype=float)
+    names = pd.Index(opps).str.title().tolist()
+
+    def matrix(values: np.ndarray, edges: list[int]) -> dict:
+        n_b = len(edges) + 1
+        ok = ~np.isnan(values)
+        idx = opp_codes[ok] * n_b + np.digitize(values[ok], edges)
+        size = len(opps) * n_b
+        games = np.bincount(idx, minlength=size).reshape(len(opps), n_b)
+        wins = np.bincount(idx, weights=win[ok], minlength=size).reshape(len(opps), n_b)
+        return {
+            "edges": list(edges),
+            "brackets": _bracket_labels(edges),
+            "rows": _records(opponent=names, games=games.tolist(), wins=wins.astype(np.int64).tolist()),
+        }
+
+    return {
+        "opponent_mr": matrix(opp_mr, OPP_MR_BRACKETS),
+        "mr_diff": matrix(player_mr - opp_mr, MR_DIFF_BRACKETS),
+    }
+
+
+def _over_expectation_rows(games, wins, expected, **keys) -> list[dict]:
+    games = np.asarray(games, dtype=float)
+    diff = np.asarray(wins, dtype=float) - np.asarray(expected, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_game = diff / games * 100
+    return _records(
+        **keys,
+        games=_int_col(games),
+        wins=_int_col(wins),
+        expected_wins=_col(expected, 2),
+        over_expectation=_col(diff, 2),
+        over_expectation_pct=_col(per_game, 1),
+    )
+
+
+def compute_performance_over_expectation(cube_rank: pd.DataFrame, sessions: pd.DataFrame) -> dict:
+    """
+    Actual wins minus Elo-style expected wins (expected_score on the MR gap),
+    by matchup, session length (SESSION_BUCKETS), week (Monday start) and
+    day/2-hour bucket. Everything is a rollup of the cube's expected_sum or
+    the sessions frame, so the size doesn't grow with the number of sessions.
+    """
+    total = cube_rank[["games", "wins", "expected_sum"]].sum()
+
+    opp = rollup(cube_rank, ["opp_char_norm"])
+
+    days = rollup(cube_rank, ["local_day"])
+    week_start = days["local_day"] - pd.to_timedelta(days["local_day"].dt.weekday, unit="D")
+    weeks = days.groupby(np.asarray(_date_col(week_start), dtype=object))[CUBE_MEASURES].sum()
+
+    cells = rollup(cube_rank, ["local_day", "hour_bucket"])
+    cells["day_of_week"] = cells["local_day"].dt.day_name()
+    tod = rollup(cells, ["day_of_week", "hour_bucket"])
+
+    by_length = (
+        sessions.assign(bucket=session_bucket(sessions["size"].astype(int)))
+        .groupby("bucket")
+        .agg(sessions=("size", "size"), games=("size", "sum"), wins=("wins", "sum"), expected=("expected_wins", "sum"))
+        .reindex(SESSION_BUCKETS)
+        .dropna(subset=["sessions"])
+    )
+
+    return {
+        "scale": EXPECTED_SCORE_SCALE,
+        "overall": _over_expectation_rows([total["games"]], [total["wins"]], [total["expected_sum"]])[0]
+        if total["games"]
+        else None,
+        "by_matchup": _over_expectation_rows(
+            opp["games"], opp["wins"], opp["expected_sum"], opponent=opp["opp_char_norm"].str.title().tolist()
+        ),
+        "by_session_length": _over_expectation_rows(
+            by_length["games"], by_length["wins"], by_length["expected"],
+            range=by_length.index.tolist(),
+            sessions=_int_col(by_length["sessions"]),
+        ),
+        "by_week": _over_expectation_rows(
+            weeks["games"], weeks["wins"], weeks["expected_sum"], week_start=weeks.index.tolist()
+        ),
+        "by_time_of_day": _over_expectation_rows(
+            tod["games"], tod["wins"], tod["expected_sum"],
+            day=tod["day_of_week"].tolist(),
+            hour_bucket=_int_col(tod["hour_bucket"]),
+        ),
+    }
+
+
+def build_character_reports(df_rank_mr: pd.DataFrame, cube_rank: pd.DataFrame, tz_name: str = REPORT_TZ) -> dict:
+    """
+    {character: sub-report} for every played character with at least
+    MIN_GAMES_FOR_CHARACTER ranked games: matchup table, cum-winrate curves,
+    weekly MR delta and session stats.
+    Every part is one groupby keyed by character over the shared frame
+    (or the cube), so extra characters add rows, not passes.
+    """
+    known = cube_rank[cube_rank["player_char"] != ""]
+    by_char = rollup(known, ["player_char"])
+    keep = by_char.loc[by_char["games"] >= MIN_GAMES_FOR_CHARACTER, "player_char"]
+    if keep.empty or "player_character" not in df_rank_mr:
+        return {}
+
+    # Matchup tables straight from the cube
+    grp = rollup(known[known["player_char"].isin(keep)], ["player_char", "opp_char_norm"])
+    grp["winrate"] = grp["wins"] / grp["games"]
+    grp["avg_opp_mr"] = grp["opponent_mr_sum"] / grp["opponent_mr_n"].where(grp["opponent_mr_n"] > 0)
+
+    # Per-game keys, in time order
+    d = df_rank_mr.sort_values("match_timestamp", kind="stable")
+    char = d["player_character"].where(d["player_character"].notna(), "").astype(str).str.strip()
+    ts = d["match_timestamp"]
+    games = pd.DataFrame(
+        {
+            "char": char,
+            "opp": d["opp_char_norm"],
+            "win": d["win_int"].astype(int),
+            "mr": pd.to_numeric(d["player_mr"], errors="coerce"),
+            "week": _local_week_start(ts, tz_name),
+        },
+        index=d.index,
+    )
+    games = games[games["char"].isin(keep)]
+
+    # Sessions within each character's own games (same split as summarize_sessions
+    # on that character's rows; switching characters mid-session doesn't merge stretches)
+    gap_min = ts[games.index].groupby(games["char"]).diff().dt.total_seconds() / 60
+    games["sid"] = (gap_min >= SESSION_GAP_MINUTES).groupby(games["char"]).cumsum()
+
+    # Cum-winrate curves per (character, opponent); groupby keeps time order within groups
+    g = games[games["opp"].notna()].groupby(["char", "opp"], sort=False)
+    curves = games.loc[games["opp"].notna(), ["char", "opp"]].assign(
+        games_so_far=g.cumcount() + 1,
+        wins_so_far=g["win"].cumsum(),
+    )
+    curves = curves[curves["games_so_far"] >= BASELINE_N]
+    curves["cum_winrate"] = (curves["wins_so_far"] / curves["games_so_far"]).round(4)
+
+    weekly = games.groupby(["char", "week"])["mr"].agg(["first", "last"]).dropna().reset_index()
+
+    char_sessions = (
+        games.groupby(["char", "sid"])
+        .agg(size=("win", "size"), wins=("win", "sum"), mr_first=("mr", "first"), mr_last=("mr", "last"))
+        .reset_index()
+    )
+    char_sessions["mr_delta"] = char_sessions["mr_last"] - char_sessions["mr_first"]
+    session_stats = char_sessions.groupby("char").agg(
+        sessions=("size", "size"),
+        avg_games=("size", "mean"),
+        games=("size", "sum"),
+        wins=("wins", "sum"),
+        avg_mr_delta=("mr_delta", "mean"),
+    )
+
+    grp_by = dict(list(grp.groupby("player_char", sort=False)))
+    curves_by = dict(list(curves.groupby("char", sort=False)))
+    weekly_by = dict(list(weekly.groupby("char", sort=False)))
+
+    reports = {}
+    for _, row in by_char[by_char["player_char"].isin(keep)].sort_values(
+        "games", ascending=False, kind="stable"
+    ).iterrows():
+        c = row["player_char"]
+        m = grp_by[c]
+        cv = curves_by.get(c, curves.iloc[:0])
+        wk = weekly_by.get(c, weekly.iloc[:0])
+        ss = session_stats.loc[c]
+        reports[c.title()] = {
+            "games": int(row["games"]),
+            "winrate_pct": round(100 * float(row["wins"]) / float(row["games"]), 1),
+            "matchup_table": _records(
+                opponent=m["opp_char_norm"].str.title().tolist(),
+                games=_int_col(m["games"]),
+                wins=_int_col(m["wins"]),
+                winrate_pct=_col(m["winrate"] * 100, 1),
+                avg_opponent_mr=_col(m["avg_opp_mr"], 1),
+            ),
+            "matchups": [
+                {
+                    "opponent": opp.title(),
+                    "games": sub["games_so_far"].tolist(),
+                    "cum_winrate": sub["cum_winrate"].tolist(),
+                }
+                for opp, sub in cv.groupby("opp", sort=True)
+            ],
+            "mr_weekly_delta": _records(
+                week_start=wk["week"].tolist(),
+                mr_delta=_col(wk["last"] - wk["first"], 1),
+                mr_start=_col(wk["first"], 1),
+                mr_end=_col(wk["last"], 1),
+            ),
+            "session_stats": {
+                "sessions": int(ss["sessions"]),
+                "avg_games_per_session": round(float(ss["avg_games"]), 2),
+                "winrate_pct": round(100 * float(ss["wins"]) / float(ss["games"]), 1),
+                "avg_mr_delta_per_session": round(float(ss["avg_mr_delta"]), 1)
+                if pd.notna(ss["avg_mr_delta"])
+                else None,
+            },
+        }
+    return reports
+
+
+def build_ranked_summary(
+    df_rank_mr: pd.DataFrame,
+    df_all: pd.DataFrame = None,
+    cube: pd.DataFrame | None = None,
+    sessions: pd.DataFrame | None = None,
+    tz_name: str = REPORT_TZ,
+) -> dict:
+    """
+    Ranked-only, MR-valid subset for stats.
+    df_rank_mr: MR-valid ranked games (for MR trends, matchups, stats)
+    df_all: All matches (for character breakdown, defaults to df_rank_mr if None)
+    cube: stats cube of df_all in tz_name (built here if None)
+    sessions: summarize_sessions(df_rank_mr) (built here if None)
+    """
+    df = df_rank_mr
+    if df_all is None:
+        df_all = df_rank_mr  # fallback for backward compatibility
+    if cube is None:
+        cube = build_stats_cube(df_all, tz_name=tz_name)
+    cube_rank = ranked_cells(cube)
+
+    total_matches = int(len(df))
+    overall_wr = float(df["win_int"].mean()) if total_matches else 0.0
+
+    main_char = None
+    if "player_character" in df_all:
+        # Most-played known character (ties -> alphabetical, like Series.mode)
+        by_char = rollup(cube[cube["player_char"] != ""], ["player_char"])
+        if not by_char.empty:
+            main_char = by_char.sort_values("games", ascending=False, kind="stable")["player_char"].iloc[0]
+
+    char_breakdown: list[dict] = []
+    if "player_character" in df_all:
+        char_breakdown = _character_breakdown(cube)
+
+    start_ts = df["match_timestamp"].min()
+    end_ts = df["match_timestamp"].max()
+
+    grp = rollup(cube_rank, ["opp_char_norm"])
+    grp["avg_opp_mr"] = grp["opponent_mr_sum"] / grp["opponent_mr_n"].where(grp["opponent_mr_n"] > 0)
+    grp["winrate"] = grp["wins"] / grp["games"]
+    grp["ci_low"], grp["ci_high"] = wilson_interval(grp["wins"], grp["games"])
+    boot_lo, boot_hi = bootstrap_interval(grp["wins"], grp["games"])
+
+    matchup_table = _records(
+        opponent=grp["opp_char_norm"].str.title().tolist(),
+        games=_int_col(grp["games"]),
+        wins=_int_col(grp["wins"]),
+        winrate_pct=_col(grp["winrate"] * 100, 1),
+        avg_opponent_mr=_col(grp["avg_opp_mr"], 1),
+        ci_low_pct=_col(grp["ci_low"] * 100, 1),
+        ci_high_pct=_col(grp["ci_high"] * 100, 1),
+        bootstrap_low_pct=_col(boot_lo * 100, 1),
+        bootstrap_high_pct=_col(boot_hi * 100, 1),
+    )
+
+    most_played = None
+    if not grp.empty:
+        mp = grp.sort_values("games", ascending=False).iloc[0]
+        most_played = {
+            "opponent": mp["opp_char_norm"].title(),
+            "games": int(mp["games"]),
+            "winrate_pct": round(float(mp["winrate"]) * 100, 1),
+        }
+
+    best_matchup = None
+    worst_matchup = None
+    stable = grp[grp["games"] >= MIN_GAMES_FOR_STABLE]
+    if not stable.empty:
+        # Best = surely good (highest Wilson lower bound), worst = surely bad (lowest upper bound)
+        best_row = stable.sort_values("ci_low", ascending=False).iloc[0]
+        worst_row = stable.sort_values("ci_high", ascending=True).iloc[0]
+        best_matchup = {
+            "opponent": best_row["opp_char_norm"].title(),
+            "games": int(best_row["games"]),
+            "winrate_pct": round(float(best_row["winrate"]) * 100, 1),
+            "ci_low_pct": round(float(best_row["ci_low"]) * 100, 1),
+            "ci_high_pct": round(float(best_row["ci_high"]) * 100, 1),
+        }
+        worst_matchup = {
+            "opponent": worst_row["opp_char_norm"].title(),
+            "games": int(worst_row["games"]),
+            "winrate_pct": round(float(worst_row["winrate"]) * 100, 1),
+            "ci_low_pct": round(float(worst_row["ci_low"]) * 100, 1),
+            "ci_high_pct": round(float(worst_row["ci_high"]) * 100, 1),
+        }
+
+    fix_one_matchup = None
+    fix_matchups = []
+    if not grp.empty:
+        total_games = int(grp["games"].sum())
+        total_wins = float(grp["wins"].sum())
+        base_wr = total_wins / total_games if total_games else 0.0
+
+        # Gain from moving each matchup to 50%, all at once
+        gains = (0.5 * grp["games"] - grp["wins"]) / total_games if total_games else grp["games"] * 0.0
+        best_idx = int(np.argmax(gains.to_numpy()))
+        best_gain = float(gains.iloc[best_idx])
+        best_new_wr = base_wr + best_gain
+        best_row = grp.iloc[best_idx]
+
+        if best_gain > 1e-9:
+            fix_one_matchup = {
+                "opponent": best_row["opp_char_norm"].title(),
+                "games": int(best_row["games"]),
+                "current_winrate_pct": round(float(best_row["winrate"]) * 100, 1),
+                "simulated_winrate_pct": 50.0,
+                "overall_winrate_pct": round(base_wr * 100, 1),
+                "new_overall_winrate_pct": round(best_new_wr * 100, 1),
+                "lift_pct_points": round(best_gain * 100, 1),
+            }
+
+        fix_matchups = compute_fix_matchups(grp)
+
+    if sessions is None:
+        sessions = summarize_sessions(df)
+    session_stats = compute_session_insights(df, cube=cube_rank, sessions=sessions, tz_name=tz_name)
+    activity_by_day = compute_activity_by_day(df, cube=cube_rank)    # ranked+MR only (fine)
+    activity_by_week = compute_activity_by_week(df, cube=cube_rank)  # ranked+MR only (fine)
+
+    mr_timeseries = []
+    character_mr_timeseries = {}  # {character: [timeseries]}
+    mr_weekly_delta = []
+
+    if not df.empty:
+        df_mr = df.sort_values("match_timestamp")
+        player_mr = pd.to_numeric(df_mr["player_mr"], errors="coerce")
+        opponent_mr = pd.to_numeric(df_mr["opponent_mr"], errors="coerce")
+
+        def title_col(col: str) -> pd.Series:
+            if col not in df_mr:
+                return pd.Series("", index=df_mr.index)
+            return df_mr[col].fillna("").astype(str).str.strip().str.title()
+
+        mr_timeseries = _records(
+            ts=_iso_col(df_mr["match_timestamp"]),
+            mr=_col(player_mr),
+            opp_mr=_col(opponent_mr),
+            win=_int_col(df_mr["win_int"]),
+            opponent=title_col("opponent_character").tolist(),
+        )
+
+        # Per-character MR timeseries (same entry dicts, known characters with MR only)
+        player_char = title_col("player_character").to_numpy()
+        pos = np.flatnonzero((player_char != "") & player_mr.notna().to_numpy())
+        for char, idx in pd.Series(pos).groupby(player_char[pos], sort=False):
+            character_mr_timeseries[char] = [mr_timeseries[i] for i in idx]
+
+        # Weekly MR deltas (Monday start in tz_name)
+        week_start = _local_week_start(df_mr["match_timestamp"], tz_name)
+        weekly = (
+            player_mr.groupby(np.asarray(week_start, dtype=object))
+            .agg(["first", "last"])
+            .dropna()
+        )
+        mr_weekly_delta = _records(
+            week_start=weekly.index.tolist(),
+            mr_delta=_col(weekly["last"] - weekly["first"], 1),
+            mr_start=_col(weekly["first"], 1),
+            mr_end=_col(weekly["last"], 1),
+        )
+
+    return {
+        "main_character": main_char.title() if isinstance(main_char, str) else main_char,
+        "matches_analyzed": total_matches,
+        "dataset_start": start_ts.date().isoformat() if pd.notna(start_ts) else None,
+        "dataset_end": end_ts.date().isoformat() if pd.notna(end_ts) else None,
+        "overall_winrate": round(overall_wr, 4),
+        "overall_winrate_pct": round(overall_wr * 100, 1),
+        "avg_mr": float(pd.to_numeric(df["player_mr"], errors="coerce").mean()) if "player_mr" in df else None,
+        "avg_opponent_mr": float(pd.to_numeric(df["opponent_mr"], errors="coerce").mean()) if "opponent_mr" in df else None,
+        "most_played_matchup": most_played,
+        "best_matchup": best_matchup,
+        "worst_matchup": worst_matchup,
+        "min_games_for_stable": MIN_GAMES_FOR_STABLE,
+        "matchup_table": matchup_table,
+        "fix_one_matchup": fix_one_matchup,
+        "fix_matchups": fix_matchups,
+        "mr_bracket_matrix": compute_mr_bracket_matrix(df),
+        "performance_over_expectation": compute_performance_over_expectation(cube_rank, sessions),
+        "character_breakdown": char_breakdown,
+        "session_stats": session_stats,
+        "activity_by_day": activity_by_day,
+        "activity_by_week": activity_by_week,
+        "mr_timeseries": mr_timeseries,
+        "character_mr_timeseries": character_mr_timeseries,
+        "mr_weekly_delta": mr_weekly_delta,
+        "character_reports": build_character_reports(df, cube_rank, tz_name),
+    }
+
+
+# ----------------------------
+# Tiered history (players with `recent_days` in the roster)
+# Reports cover the recent window only; each older month is rolled up once
+# (summarize_months) into a frozen archive_dir(cfn)/<YYYY-MM>-<hash>.json.
+# manifest.json lists those files plus the last archived month and its
+# watermark, so later runs query only the rows after it and never re-read
+# or re-hash archived months. build_report stays free of file I/O:
+# load_player_matches reads the archive, write_report extends it.
+# ----------------------------
+ARCHIVE_MANIFEST = "manifest.json"
+
+MATCH_SINCE_QUERY = MATCH_QUERY.replace(
+    "WHERE lower(player_cfn) = lower(:player_cfn)",
+    "WHERE lower(player_cfn) = lower(:player_cfn)\n  AND match_timestamp >= :since",
+)
+
+
+def _month_start(month: str, offset: int = 0) -> pd.Timestamp:
+    """Naive local midnight starting "YYYY-MM" (plus offset months)."""
+    return (pd.Period(month, freq="M") + offset).to_timestamp()
+
+
+def archive_cutoff(ts: pd.Series, recent_days: int, tz_name: str = REPORT_TZ) -> pd.Timestamp:
+    """First local midnight of the month recent_days before the latest match (naive)."""
+    day, _ = _local_parts(utc_epoch_ns(ts), tz_name)
+    return (day.max() - pd.Timedelta(days=recent_days)).replace(day=1)
+
+
+def _month_hash(rows: pd.DataFrame, tz_name: str) -> str:
+    """Hash of everything summarize_month reads (rows in time order)."""
+    h = hashlib.sha256(f"{ARCHIVE_VERSION}|{tz_name}|{SESSION_GAP_MINUTES}|".encode())
+    h.update(utc_epoch_ns(rows["match_timestamp"]).tobytes())
+    for col in ("player_mr", "opponent_mr"):
+        h.update(pd.to_numeric(rows[col], errors="coerce").to_numpy(dtype=float).tobytes())
+    h.update(rows["win_int"].to_numpy(dtype=np.int8).tobytes())
+    h.update("\0".join(rows["opp_char_norm"].fillna("")).encode())
+    return h.hexdigest()[:ARCHIVE_HASH_CHARS]
+
+
+def summarize_month(rows: pd.DataFrame, tz_name: str = REPORT_TZ) -> dict:
+    """
+    One month of ranked, MR-valid games (time order) rolled up.
+    Sessions are split at the month boundary so the summary only depends on these rows.
+    """
+    sessions = summarize_sessions(rows)
+    mr = pd.to_numeric(rows["player_mr"], errors="coerce")
+    day, _ = _local_parts(utc_epoch_ns(rows["match_timestamp"]), tz_name)
+    size = sessions["size"]
+    mr_delta = (sessions["mr_last"] - sessions["mr_first"]).where(size > 1, 0.0)
+    games = len(rows)
+    wins = int(rows["win_int"].sum())
+    opp = rows.groupby(rows["opp_char_norm"].fillna(""))["win_int"].agg(["size", "sum"])
+
+    return {
+        "matches": games,
+        "wins": wins,
+        "winrate": round(wins / games, 4),
+        "expected_wins": round(float(sessions["expected_wins"].sum()), 2),
+        "active_days": int(day.nunique()),
+        "mr_start": _col([mr.iloc[0]], 1)[0],
+        "mr_end": _col([mr.iloc[-1]], 1)[0],
+        "mr_min": _col([mr.min()], 1)[0],
+        "mr_max": _col([mr.max()], 1)[0],
+        "sessions": len(sessions),
+        "avg_session_games": round(float(size.mean()), 2),
+        "avg_session_mr_delta": _col([mr_delta.mean()], 2)[0],
+        "max_win_streak": int(sessions["max_win_streak"].max()),
+        "max_loss_streak": int(sessions["max_loss_streak"].max()),
+        "matchups": _records(
+            opponent=opp.index.str.title().tolist(),
+            games=_int_col(opp["size"]),
+            wins=_int_col(opp["sum"]),
+        ),
+    }
+
+
+def summarize_months(df_rank_mr: pd.DataFrame, tz_name: str = REPORT_TZ) -> list[dict]:
+    """Archive entries ({month, hash, last_match, **summarize_month}) per local month, oldest first."""
+    d = df_rank_mr.sort_values("match_timestamp", kind="stable")
+    epoch = utc_epoch_ns(d["match_timestamp"])
+    d, epoch = d[epoch != _NAT], epoch[epoch != _NAT]
+    if d.empty:
+        return []
+
+    month = np.datetime_as_string(local_epoch_ns(epoch, tz_name).view("datetime64[ns]"), unit="M")
+    return [
+        {
+            "month": key,
+            "hash": _month_hash(rows, tz_name),
+            "last_match": pd.Timestamp(utc_epoch_ns(rows["match_timestamp"])[-1], tz="UTC").isoformat(),
+            **summarize_month(rows, tz_name),
+        }
+        for key, rows in d.groupby(month, sort=True)
+    ]
+
+
+def split_history(
+    df_all: pd.DataFrame, recent_days: int, tz_name: str = REPORT_TZ, archive: dict | None = None
+) -> tuple[pd.DataFrame, dict]:
+    """
+    (rows from recent_from on, history) for normalized rows. recent_from is the
+    month recent_days before the latest match, and never before the month after
+    the archive's last one; ranked, MR-valid rows before it become new months
+    appended to the archive's.
+    """
+    recent_from = archive_cutoff(df_all["match_timestamp"], recent_days, tz_name)
+    months = list(archive["months"]) if archive else []
+    if months:
+        recent_from = max(recent_from, _month_start(months[-1]["month"], 1))
+
+    epoch = utc_epoch_ns(df_all["match_timestamp"])
+    old = (epoch != _NAT) & (epoch < local_midnight_utc_ns(recent_from, tz_name))
+    older = df_all[old]
+    months += summarize_months(older[older["match_mode"].eq("rank") & older["mr_valid"]], tz_name)
+    history = {"recent_days": recent_days, "recent_from": recent_from.date().isoformat(), "months": months}
+    return df_all[~old], history
+
+
+def load_archive(player_cfn: str, tz_name: str) -> dict | None:
+    """
+    The player's manifest with its month entries, or None when there is none
+    (or it was built for another timezone / ARCHIVE_VERSION: start over).
+    """
+    out_dir = archive_dir(player_cfn)
+    path = out_dir / ARCHIVE_MANIFEST
+    if not path.exists():
+        return None
+    manifest = json.loads(path.read_bytes())
+    if manifest.get("version") != ARCHIVE_VERSION or manifest.get("timezone") != tz_name:
+        return None
+    try:
+        months = [json.loads((out_dir / name).read_bytes()) for name in manifest["files"]]
+    except FileNotFoundError:
+        return None
+    return {**manifest, "months": months}
+
+
+def save_archive(report: dict, player_cfn: str) -> None:
+    """Write new month files from report["summary"]["history"] and point the manifest at them."""
+    history = report.get("summary", {}).get("history")
+    if not history or not history["months"]:
+        return
+    months = history["months"]
+
+    out_dir = archive_dir(player_cfn)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    files = []
+    for entry in months:
+        path = out_dir / f"{entry['month']}-{entry['hash']}.json"
+        if not path.exists():
+            for stale in out_dir.glob(f"{entry['month']}-*.json"):  # month rebuilt (new tz / version)
+                stale.unlink(missing_ok=True)
+            path.write_bytes(dumps_report(entry))
+        files.append(path.name)
+
+    manifest = {
+        "version": ARCHIVE_VERSION,
+        "timezone": report["timezone"],
+        "through": str(pd.Period(history["recent_from"], freq="M") - 1),  # last month rolled up
+        "watermark": months[-1]["last_match"],  # last archived match
+        "files": files,
+    }
+    tmp = out_dir / f".{ARCHIVE_MANIFEST}.{os.getpid()}"  # concurrent writers never see half a manifest
+    tmp.write_bytes(dumps_report(manifest))
+    tmp.replace(out_dir / ARCHIVE_MANIFEST)
+
+
+def archive_since(archive: dict) -> pd.Timestamp:
+    """UTC start of the month after the archive's last one (where loaded rows begin)."""
+    month_start = _month_start(archive["through"], 1)
+    return pd.Timestamp(local_midnight_utc_ns(month_start, archive["timezone"]), tz="UTC")
+
+
+def load_player_matches(conn, player_cfn: str, config: dict | None = None) -> tuple[pd.DataFrame, dict | None]:
+    """
+    (MATCH_QUERY rows, archive) for build_report. Tiered players with an
+    archive only have the rows after its last month read.
+    """
+    if not player_recent_days(player_cfn, config):
+        return load_matches(conn, player_cfn), None
+    tz_name = player_timezone(player_cfn, config)
+    archive = load_archive(player_cfn, tz_name)
+    if archive is None:
+        return load_matches(conn, player_cfn), None
+
+    params = {"player_cfn": player_cfn, "since": archive_since(archive).to_pydatetime()}
+    return pd.read_sql(text(MATCH_SINCE_QUERY), conn, params=params), archive
+
+
+# ----------------------------
+# JSON build
+# ----------------------------
+def load_matches(conn, player_cfn: str) -> pd.DataFrame:
+    """Run MATCH_QUERY for one player on a sync engine/connection."""
+    return pd.read_sql(text(MATCH_QUERY), conn, params={"player_cfn": player_cfn})
+
+
+def _norm_lower(values: pd.Series) -> pd.Series:
+    """
+    Stripped, lower-cased text with nulls kept null (before pandas 3,
+    astype(str) alone turns None into "none"; the Polars engine keeps null).
+    """
+    return values.astype(str).str.strip().str.lower().where(values.notna())
+
+
+def normalize_matches(df: pd.DataFrame) -> pd.DataFrame:
+    """Parse timestamps, normalize opponent/mode strings, add win_int and mr_valid."""
+    df = df.copy()
+    df["match_timestamp"] = pd.to_datetime(df["match_timestamp"], errors="coerce")
+    df["opp_char_norm"] = _norm_lower(df["opponent_character"])
+    df["win_int"] = _norm_lower(df["is_winner"]).eq("true").astype(int)
+    df["match_mode"] = _norm_lower(df["match_mode"])
+
+    # MR-era validity flag (only meaningful for ranked visuals)
+    df["mr_valid"] = (
+        pd.to_numeric(df["player_mr"], errors="coerce").le(MR_MAX)
+        & pd.to_numeric(df["opponent_mr"], errors="coerce").le(MR_MAX)
+    )
+    return df
+
+
+def compute_matchup_curves(df_rank_mr: pd.DataFrame) -> list[dict]:
+    """
+    Cumulative winrate per opponent, from game BASELINE_N on.
+    df_rank_mr must be sorted by (opp_char_norm, match_timestamp).
+    """
+    d = df_rank_mr[df_rank_mr["opp_char_norm"].notna()]
+    if d.empty:
+        return []
+
+    opp = d["opp_char_norm"]
+    games_so_far = d.groupby(opp).cumcount() + 1
+    wins_so_far = d.groupby(opp)["win_int"].cumsum()
+    curves = pd.DataFrame(
+        {
+            "opp_char_norm": opp,
+            "games_so_far": games_so_far,
+            "cum_winrate": (wins_so_far / games_so_far).round(4),
+        }
+    )
+    curves = curves[curves["games_so_far"] >= BASELINE_N]
+
+    matchups_out = []
+    for opp_name, sub in curves.groupby("opp_char_norm", sort=True):
+        matchups_out.append(
+            {
+                "opponent": opp_name.title(),
+                "games": sub["games_so_far"].tolist(),
+                "cum_winrate": sub["cum_winrate"].tolist(),
+            }
+        )
+    return matchups_out
+
+
+# Stages an alternate engine can replace; each returns the same frames / lists
+# as the pandas version so the summary builders stay shared.
+STAGES = {
+    "normalize": normalize_matches,
+    "cube": build_stats_cube,
+    "sessions": summarize_sessions,
+    "curves": compute_matchup_curves,
+}
+
+
+def _stages(engine: str) -> dict:
+    if engine == "polars":
+        import sf6_polars_engine  # polars is only needed for this engine
+
+        return sf6_polars_engine.STAGES
+    if engine != "pandas":
+        raise ValueError(f"Unknown engine {engine!r} (expected one of {ENGINES})")
+    return STAGES
+
+
+def build_report(
+    df: pd.DataFrame,
+    player_cfn: str,
+    engine: str = "pandas",
+    tz_name: str | None = None,
+    recent_days: int | None = None,
+    config: dict | None = None,
+    archive: dict | None = None,
+) -> dict:
+    """
+    Build the report dict from the raw MATCH_QUERY rows of one player.
+    Days, weeks and hours are local to tz_name (default: the player's roster timezone).
+    With recent_days (default: the roster's `recent_days`) the report covers
+    only the rows from the month recent_days back (see split_history); older
+    months are summarized into summary.history, after archive's (load_archive).
+    Roster settings come from config (a loaded roster file; default: CONFIG_PATH).
+    """
+    if df.empty:
+        print(f"[WARN] No matches for {player_cfn}")
+        return {}
+
+    stages = _stages(engine)
+    tz_name = tz_name or player_timezone(player_cfn, config)
+    recent_days = recent_days or player_recent_days(player_cfn, config)
+
+    # Parse + normalize
+    df_all = stages["normalize"](df)
+    history = None
+    if recent_days:
+        df_all, history = split_history(df_all, recent_days, tz_name, archive)
+    cube = stages["cube"](df_all, tz_name)
+    is_rank = df_all["match_mode"].eq("rank")
+    df_rank_all = df_all[is_rank].copy()  # ALL ranked games (for character breakdown)
+    df_rank_mr = df_all[is_rank & df_all["mr_valid"]].copy()  # MR-valid only (for MR chart/matchups)
+
+    # Ranked matchup curves should use ranked+MR-valid only
+    df_rank_mr = df_rank_mr.sort_values(["opp_char_norm", "match_timestamp"])
+    matchups_out = stages["curves"](df_rank_mr)
+
+    ranked = {}
+    if not df_rank_mr.empty:
+        sessions = stages["sessions"](df_rank_mr)
+        ranked = build_ranked_summary(df_rank_mr, df_all, cube=cube, sessions=sessions, tz_name=tz_name)
+
+    summary = {
+        "overall": build_overall_summary(df_all, cube=cube),
+        "ranked": ranked,
+        "activity_by_week_modes": compute_activity_by_week_modes(df_all, cube=cube),  # ✅ all-modes heatmap input
+    }
+    extra_tz = [tz for tz in player_activity_timezones(player_cfn, config) if tz != tz_name]
+    if extra_tz:
+        summary["activity_by_week_tz"] = compute_activity_by_week_tz(df_all, extra_tz)
+    if history is not None:
+        summary["history"] = history
+
+    watermark = df_all["match_timestamp"].max()
+    out = {
+        "player_cfn": player_cfn,
+        "generated_at": pd.Timestamp.utcnow().isoformat(),
+        "source_watermark": watermark.isoformat() if pd.notna(watermark) else None,  # latest match covered
+        "baseline_n": BASELINE_N,
+        "roster_benchmark": ROSTER_FILE,  # shared roster baseline, relative to this file
+        "timezone": tz_name,
+        "summary": summary,
+        "matchups": matchups_out,
+    }
+
+    return out
+
+
+def build_player_json(engine, player_cfn: str) -> dict:
+    df, archive = load_player_matches(engine, player_cfn)
+    return build_report(df, player_cfn, archive=archive)
+
+
+def write_report(report: dict, player_cfn: str) -> Path:
+    """Write the report, its Plotly figure specs and any newly archived months; return the report path."""
+    out_path = report_path(player_cfn)
+    out_path.write_bytes(dumps_report(report))
+    save_archive(report, player_cfn)
+
+    fig_path = figures_path(player_cfn)
+    fig_path.parent.mkdir(parents=True, exist_ok=True)
+    fig_path.write_bytes(dumps_report(build_figure_specs(report)))
+    return out_path
+
+
+# ----------------------------
+# Roster benchmark
+# ----------------------------
+def roster_slice(
+    df: pd.DataFrame, player_cfn: str, archive: dict | None = None
+) -> tuple[pd.Timestamp | None, pd.DataFrame]:
+    """
+    (window start, ranked rows) of one player's loaded frame, kept for the
+    roster benchmark. The start is archive_since for tiered players whose
+    frame only holds rows after their archive, None for a whole history.
+    """
+    d = df.assign(player_cfn=player_cfn.lower())[ROSTER_COLUMNS]
+    return (archive_since(archive) if archive else None), d[_norm_lower(d["match_mode"]).eq("rank")]
+
+
+def build_roster_benchmark(df: pd.DataFrame, window_from: pd.Timestamp | None = None) -> dict:
+    """
+    Per-opponent baselines for the whole roster from one multi-player frame.
+
+    All counts come from np.bincount over (player, opponent[, MR-diff bin])
+    codes, so the cost is one pass regardless of roster size. Per player:
+    - roster_winrate: everyone else's pooled winrate vs that opponent
+    - percentile: rank among players with >= MIN_GAMES_FOR_STABLE games there
+    - expected_winrate: everyone else's winrate at the same MR difference,
+      weighted by this player's own games (MR-adjusted baseline)
+    window_from is only recorded: where df was cut off (None = whole careers).
+    """
+    if df.empty:
+        return {}
+
+    d = normalize_matches(df)
+    d = d[d["match_mode"].eq("rank") & d["mr_valid"] & d["opp_char_norm"].notna()]
+    if d.empty:
+        return {}
+
+    p_codes, players = pd.factorize(d["player_cfn"], sort=True)
+    o_codes, opps = pd.factorize(d["opp_char_norm"], sort=True)
+    n_p, n_o = len(players), len(opps)
+    n_b = 2 * (ROSTER_MR_DIFF_CLIP // ROSTER_MR_DIFF_STEP) + 1
+    win = d["win_int"].to_numpy(dtype=float)
+
+    mr_diff = (pd.to_numeric(d["player_mr"]) - pd.to_numeric(d["opponent_mr"])).to_numpy(dtype=float)
+    mr_diff = np.clip(mr_diff, -ROSTER_MR_DIFF_CLIP, ROSTER_MR_DIFF_CLIP) + ROSTER_MR_DIFF_CLIP
+    b_codes = (mr_diff // ROSTER_MR_DIFF_STEP).astype(np.int64)
+
+    # (player, opponent, bin) games/wins; everything else is a reduction of these
+    idx = (p_codes * n_o + o_codes) * n_b + b_codes
+    size = n_p * n_o * n_b
+    games_pob = np.bincount(idx, minlength=size).reshape(n_p, n_o, n_b)
+    wins_pob = np.bincount(idx, weights=win, minlength=size).reshape(n_p, n_o, n_b)
+
+    games = games_pob.sum(axis=2)
+    wins = wins_pob.sum(axis=2)
+    opp_games = games.sum(axis=0)
+    opp_wins = wins.sum(axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        winrate = wins / games
+        others_wr = (opp_wins - wins) / (opp_games - games)
+
+        # Others' winrate per MR-diff bin, applied to this player's games in that bin
+        others_bin_games = games_pob.sum(axis=0) - games_pob
+        others_bin_wr = (wins_pob.sum(axis=0) - wins_pob) / others_bin_games
+        covered = np.where(others_bin_games > 0, games_pob, 0)
+        expected = np.nansum(covered * others_bin_wr, axis=2) / covered.sum(axis=2)
+
+    # Percentile among players with a stable sample in that matchup
+    stable_wr = np.where(games >= MIN_GAMES_FOR_STABLE, winrate, np.nan)
+    below = (stable_wr[None, :, :] < stable_wr[:, None, :]).sum(axis=1)
+    ties = (stable_wr[None, :, :] == stable_wr[:, None, :]).sum(axis=1)
+    n_stable = np.isfinite(stable_wr).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percentile = np.where(np.isfinite(stable_wr), (below + 0.5 * ties) / n_stable * 100, np.nan)
+
+    opp_titles = pd.Index(opps).str.title()
+    by_player = {}
+    for i, cfn in enumerate(players):
+        played = games[i] > 0
+        by_player[cfn] = _records(
+            opponent=opp_titles[played].tolist(),
+            games=_int_col(games[i, played]),
+            winrate=_col(winrate[i, played], 4),
+            roster_winrate=_col(others_wr[i, played], 4),
+            percentile=_col(percentile[i, played], 1),
+            expected_winrate=_col(expected[i, played], 4),
+            mr_adjusted_delta=_col(winrate[i, played] - expected[i, played], 4),
+        )
+
+    watermark = d["match_timestamp"].max()
+    return {
+        "generated_at": pd.Timestamp.utcnow().isoformat(),
+        "source_watermark": watermark.isoformat() if pd.notna(watermark) else None,
+        "window_from": window_from.isoformat() if window_from is not None else None,
+        "players": list(players),
+        "min_games_for_percentile": MIN_GAMES_FOR_STABLE,
+        "mr_diff_step": ROSTER_MR_DIFF_STEP,
+        "opponents": _records(
+            opponent=opp_titles.tolist(),
+            games=_int_col(opp_games),
+            wins=_int_col(opp_wins),
+            winrate=_col(opp_wins / opp_games, 4),
+            players=_int_col((games > 0).sum(axis=0)),
+        ),
+        "by_player": by_player,
+    }
+
+
+def write_roster(roster: list[str], slices: dict[str, tuple]) -> Path | None:
+    """
+    Write roster.json from the roster_slice results a build batch already
+    loaded ({lower(cfn): (window start, rows)}). Partial batches leave the
+    file as it is (it is refreshed by the next whole-roster build) rather
+    than re-reading everyone's history.
+    Tiered players only loaded their recent months, so every player is cut
+    to the latest of their window starts: one window for the whole roster,
+    recorded as window_from.
+    """
+    missing = [cfn for cfn in roster if cfn.lower() not in slices]
+    if missing:
+        print(f"{ROSTER_FILE} not refreshed (batch did not load {len(missing)} roster player(s))")
+        return None
+
+    parts = [slices[cfn.lower()] for cfn in roster]
+    window_from = max((since for since, _ in parts if since is not None), default=None)
+    frames = [rows for _, rows in parts]
+    if window_from is not None:
+        frames = [rows[utc_epoch_ns(rows["match_timestamp"]) >= window_from.value] for rows in frames]
+    benchmark = build_roster_benchmark(pd.concat(frames, ignore_index=True), window_from)
+    if not benchmark:
+        print("[WARN] No ranked matches for the roster benchmark")
+        return None
+    out_path = roster_path()
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_bytes(dumps_report(benchmark))
+    return out_path
+
+
+# ----------------------------
+# Async ingest
+# ----------------------------
+async def _fetch_matches(
+    async_engine, sem: asyncio.Semaphore, player_cfn: str, config: dict | None = None
+) -> tuple[pd.DataFrame, dict | None]:
+    async with sem:
+        async with async_engine.connect() as conn:
+            return await conn.run_sync(load_player_matches, player_cfn, config)
+
+
+async def _build_one(async_engine, sem, pool, player_cfn: str, engine: str = "pandas", config: dict | None = None):
+    """
+    Fetch one player, then hand the frame to the CPU pool.
+    Failures are reported and returned as None so the batch keeps going.
+    Returns (player_cfn, report, roster_slice(...) or None if the fetch failed).
+    """
+    ranked = None
+    try:
+        df, archive = await _fetch_matches(async_engine, sem, player_cfn, config)
+        ranked = roster_slice(df, player_cfn, archive)
+        loop = asyncio.get_running_loop()
+        build = partial(build_report, df, player_cfn, engine, config=config, archive=archive)  # pickled to the worker
+        report = await loop.run_in_executor(pool, build)
+    except Exception as exc:
+        print(f"[WARN] {player_cfn}: {type(exc).__name__}: {exc}")
+        return player_cfn, None, ranked
+    return player_cfn, report, ranked
+
+
+async def build_reports_async(
+    cfns: list[str],
+    concurrency: int = FETCH_CONCURRENCY,
+    workers: int = BUILD_WORKERS,
+    engine: str = "pandas",
+    config: dict | None = None,
+):
+    """
+    Yield (player_cfn, report, roster_slice) as each player finishes.
+    Up to `concurrency` queries run at once on a pooled async engine, and
+    build_report runs in a process pool so DB waits overlap pandas work.
+    report is None when that player failed, {} when it has no matches.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_size=concurrency, max_overflow=0)
+    sem = asyncio.Semaphore(concurrency)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            tasks = [asyncio.create_task(_build_one(async_engine, sem, pool, cfn, engine, config)) for cfn in cfns]
+            for task in asyncio.as_completed(tasks):
+                yield await task
+    finally:
+        await async_engine.dispose()
+
+
+def _finish_roster(roster: list[str] | None, slices: dict[str, pd.DataFrame]):
+    if roster:
+        out_path = write_roster(roster, slices)
+        if out_path:
+            print(f"Wrote {out_path}")
+
+
+def main_sync(
+    cfns: list[str], engine: str = "pandas", roster: list[str] | None = None, config: dict | None = None
+) -> list[str]:
+    """
+    Build and write reports one after another on a plain engine; return failed players.
+    Cheaper than main_async for one or two players (no pools, no asyncpg).
+    With roster, roster.json is rebuilt from the same frames (see write_roster).
+    config: loaded roster file for per-player settings (default: CONFIG_PATH).
+    """
+    from sqlalchemy import create_engine
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    failed = []
+    slices = {}
+    with create_engine(DATABASE_URL).connect() as conn:
+        for cfn in cfns:
+            try:
+                df, archive = load_player_matches(conn, cfn, config)
+                slices[cfn.lower()] = roster_slice(df, cfn, archive)
+                report = build_report(df, cfn, engine, config=config, archive=archive)
+            except Exception as exc:
+                print(f"[WARN] {cfn}: {type(exc).__name__}: {exc}")
+                failed.append(cfn)
+                continue
+            if report:
+                print(f"Wrote {write_report(report, cfn)}")
+    _finish_roster(roster, slices)
+    return failed
+
+
+async def main_async(
+    cfns: list[str], engine: str = "pandas", roster: list[str] | None = None, config: dict | None = None
+) -> list[str]:
+    """Build and write reports for cfns (roster.json and config as in main_sync); return the players that failed."""
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    failed = []
+    slices = {}
+    async for cfn, report, ranked in build_reports_async(cfns, engine=engine, config=config):
+        if ranked is not None:
+            slices[cfn.lower()] = ranked
+        if report is None:
+            failed.append(cfn)
+            continue
+        if not report:
+            continue
+        print(f"Wrote {write_report(report, cfn)}")
+    _finish_roster(roster, slices)
+    return failed
+